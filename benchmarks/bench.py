@@ -0,0 +1,365 @@
+"""Benchmarks for the slow parts of generating a puzzle.
+
+Run from the repo root::
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --compare results.json
+
+Everything runs offline against a synthetic word list built from a fixed seed (so the
+numbers don't depend on which word files happen to be installed), and every puzzle
+uses a fixed seed, so two runs do the same work. Results are written as JSON keyed by
+benchmark name and parameters; ``--compare`` re-runs and reports anything that got
+slower than a saved run by more than ``--threshold``. Every run also checks that
+importing the package and the CLI stays within ``IMPORT_BUDGETS`` and doesn't import
+anything in ``DEFERRED_MODULES``, exiting non-zero if not.
+"""
+
+import argparse
+import hashlib
+import json
+import pathlib
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from wordsearch import (  # noqa: E402
+    _array_grid,
+    _bonus_words,
+    _compiled_dictionary,
+    _english_words,
+    _generator,
+)
+
+_NOISE_FLOOR = 0.005  # seconds; differences between timings this short are mostly noise
+_SYLLABLES = [consonant + vowel for consonant in "bcdfghjklmnprstvwz" for vowel in "aeiou"] + list(
+    "aeiou"
+)
+
+GRID_SIZES = (10, 30, 100, 200)
+WORD_COUNTS = {10: (4, 8), 30: (10, 40), 100: (40, 150), 200: (40, 300)}
+DICTIONARY_SIZES = (10_000, 100_000)
+QUICK_GRID_SIZES = (10, 30)
+QUICK_DICTIONARY_SIZES = (10_000,)
+
+# seconds an import may add to bare interpreter startup, and modules it must not pull in
+IMPORT_BUDGETS = {"wordsearch": 0.05, "wordsearch.__main__": 0.25}
+DEFERRED_MODULES = ("asyncio", "cProfile", "multiprocessing", "numpy", "tqdm")
+
+
+class Result(typing.NamedTuple):
+    name: str
+    params: typing.Dict[str, typing.Any]
+    times: typing.List[float]
+    error: typing.Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return self.name + "".join(
+            f" {name}={value}" for name, value in sorted(self.params.items())
+        )
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        result = {"name": self.name, "params": self.params, "repeats": len(self.times)}
+        if self.times:
+            result["min"] = min(self.times)
+            result["median"] = statistics.median(self.times)
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+def synthetic_words(count: int, seed: int = 0) -> typing.List[str]:
+    """``count`` distinct made-up words of 2-5 syllables (lengths roughly like a real word list)."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 5))))
+    return sorted(words)
+
+
+def search_words(
+    dictionary_words: typing.Sequence[str], count: int, max_length: int, seed: int
+) -> typing.List[str]:
+    """``count`` search words that fit a ``max_length`` grid, from the dictionary so they cross."""
+    rng = random.Random(seed)
+    fitting = [word for word in dictionary_words if 3 <= len(word) <= max_length]
+    return rng.sample(fitting, min(count, len(fitting)))
+
+
+def _time(
+    name: str,
+    params: typing.Dict[str, typing.Any],
+    repeats: int,
+    run: typing.Callable[[], typing.Any],
+) -> Result:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        try:
+            run()
+        except ValueError as e:  # e.g. the words didn't fit; record it rather than stop the sweep
+            return Result(name, params, times, str(e))
+        times.append(time.perf_counter() - start)
+    return Result(name, params, times)
+
+
+def bench_dictionary_load(
+    word_file: pathlib.Path, size: int, repeats: int
+) -> typing.Iterator[Result]:
+    params = {"dictionary": size}
+    yield _time(
+        "dictionary_load_text", params, repeats, lambda: _english_words.load_words([(word_file, 1)])
+    )
+
+    dictionary = _english_words.load_words([(word_file, 1)])
+    compiled_file = word_file.with_suffix(".bin")
+    fingerprint = hashlib.sha256(b"bench").digest()  # the header holds exactly 32 bytes
+    yield _time(
+        "dictionary_compile",
+        params,
+        repeats,
+        lambda: _compiled_dictionary.write(
+            compiled_file, dictionary.root, fingerprint, dictionary.max_word_length
+        ),
+    )
+
+    def load_compiled():
+        if _compiled_dictionary.load(compiled_file, fingerprint) is None:
+            raise ValueError("the compiled dictionary was rejected")
+
+    yield _time("dictionary_load_compiled", params, repeats, load_compiled)
+
+
+_REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def _run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=_REPO_ROOT
+    ).stdout
+
+
+def deferred_imports(module: str) -> typing.List[str]:
+    """The ``DEFERRED_MODULES`` a fresh interpreter has loaded after importing ``module``."""
+    return _run_python(
+        f"import sys, {module}; "
+        f"print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    ).split()
+
+
+def bench_imports(
+    repeats: int, modules: typing.Iterable[str] = tuple(IMPORT_BUDGETS)
+) -> typing.Iterator[Result]:
+    """Time a fresh interpreter importing each of ``modules``, less a bare interpreter's startup."""
+    startup = min(_time("python_startup", {}, max(repeats, 5), lambda: _run_python("pass")).times)
+    for module in modules:
+        result = _time(
+            "import", {"module": module}, max(repeats, 5), lambda: _run_python(f"import {module}")
+        )
+        yield result._replace(times=[max(0.0, seconds - startup) for seconds in result.times])
+
+
+def check_imports(results: typing.List[Result]) -> int:
+    """Print every import over its budget or pulling in a module it should defer; count them."""
+    problems = 0
+    for result in results:
+        if result.name != "import":
+            continue
+        module = result.params["module"]
+        if min(result.times) > IMPORT_BUDGETS[module]:
+            problems += 1
+            budget = IMPORT_BUDGETS[module]
+            print(f"OVER BUDGET import {module}: {min(result.times):.4f}s (budget {budget}s)")
+        imported = deferred_imports(module)
+        if imported:
+            problems += 1
+            print(f"import {module} also imports {', '.join(imported)}, which should wait")
+    return problems
+
+
+def _grid_backend(size: int) -> str:
+    return "numpy" if size >= 100 and _array_grid.AVAILABLE else "lists"
+
+
+def _placed_grid(words, size: int, hardness_level: str, seed: int):
+    grid = (
+        _array_grid.make_grid(size, size)
+        if _grid_backend(size) == "numpy"
+        else _generator.make_grid(size, size)
+    )
+    coords = _generator.fill_in_grid(words, hardness_level, grid, random.Random(seed))
+    return grid, coords
+
+
+def bench_puzzles(
+    dictionary_words: typing.Sequence[str],
+    dictionary: _english_words.Dictionary,
+    sizes: typing.Sequence[int],
+    repeats: int,
+    seed: int,
+) -> typing.Iterator[Result]:
+    automaton = _english_words.automaton_for(
+        dictionary
+    )  # built once up front, not inside the first timing
+    for size in sizes:
+        for count in WORD_COUNTS[size]:
+            if _grid_backend(size) == "lists" and size >= 100 and count > 40:
+                continue  # minutes per run without numpy
+            words = search_words(dictionary_words, count, size, seed)
+            for hardness_level in _generator.HARDNESS_LEVELS:
+                params = {
+                    "size": size,
+                    "words": count,
+                    "hardness": hardness_level,
+                    "backend": _grid_backend(size),
+                    "dictionary": len(dictionary_words),
+                }
+                yield _time(
+                    "placement",
+                    params,
+                    repeats,
+                    lambda: _placed_grid(words, size, hardness_level, seed),
+                )
+
+                try:
+                    grid, coords = _placed_grid(words, size, hardness_level, seed)
+                except ValueError:
+                    continue  # already recorded by the placement benchmark
+                for fill_mode in _generator.FILL_MODES:
+
+                    def fill():
+                        # the fill writes into the grid, so work on a fresh copy each time
+                        copy = (
+                            grid.copy() if _array_grid.is_array(grid) else [row[:] for row in grid]
+                        )
+                        return _generator.safe_random_fill(
+                            words,
+                            copy,
+                            coords,
+                            random.Random(seed),
+                            fill_mode=fill_mode,
+                            dictionary=dictionary,
+                        )
+
+                    yield _time("fill_and_repair", dict(params, fill_mode=fill_mode), repeats, fill)
+
+                filled, _ = fill()
+                allowed = _bonus_words.allowed_words(words)
+                yield _time(
+                    "scan",
+                    params,
+                    repeats,
+                    lambda: _bonus_words.find_all_hits(filled, automaton, allowed),
+                )
+
+
+def _collect(benchmark: typing.Iterator[Result], results: typing.List[Result]):
+    for result in benchmark:
+        summary = "error: " + result.error if result.error else f"{min(result.times):.4f}s"
+        print(f"{result.key}: {summary}", file=sys.stderr)
+        results.append(result)
+
+
+def run(quick: bool, repeats: int, seed: int) -> typing.List[Result]:
+    results = []
+    _collect(bench_imports(repeats), results)
+    sizes = QUICK_GRID_SIZES if quick else GRID_SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        for dictionary_size in QUICK_DICTIONARY_SIZES if quick else DICTIONARY_SIZES:
+            dictionary_words = synthetic_words(dictionary_size, seed)
+            word_file = pathlib.Path(directory, f"words_{dictionary_size}.txt")
+            word_file.write_text("\n".join(dictionary_words))
+
+            benchmarks = [
+                bench_dictionary_load(word_file, dictionary_size, repeats),
+                bench_puzzles(
+                    dictionary_words,
+                    _english_words.load_words([(word_file, 1)]),
+                    sizes,
+                    repeats,
+                    seed,
+                ),
+            ]
+            for benchmark in benchmarks:
+                _collect(benchmark, results)
+    return results
+
+
+def compare(
+    results: typing.List[Result], baseline: typing.Dict[str, typing.Any], threshold: float
+) -> int:
+    """Print every benchmark more than ``threshold`` slower than the baseline; return how many."""
+    previous = baseline["results"]
+    regressions = 0
+    for result in results:
+        old = previous.get(result.key)
+        if (
+            not old
+            or "min" not in old
+            or not result.times
+            or max(old["min"], min(result.times)) < _NOISE_FLOOR
+        ):
+            continue
+        ratio = min(result.times) / old["min"] if old["min"] else 1.0
+        if ratio > 1 + threshold:
+            regressions += 1
+            print(
+                f"SLOWER {result.key}: {old['min']:.4f}s -> {min(result.times):.4f}s ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--quick", action="store_true", help="Small grids and one dictionary size only."
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Runs of each benchmark (the fastest is compared)."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=1, help="Seed for the word list and every puzzle."
+    )
+    parser.add_argument("--output", type=pathlib.Path, help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--compare", type=pathlib.Path, help="A previous --output to check for regressions against."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Slowdown that counts as a regression (0.25 = 25%%).",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.repeats, args.seed)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": _array_grid.AVAILABLE,
+            "seed": args.seed,
+            "repeats": args.repeats,
+            "quick": args.quick,
+        },
+        "results": {result.key: result.as_dict() for result in results},
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    problems = check_imports(results)
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        print(f"{regressions} regression(s) against {args.compare}")
+        problems += regressions
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
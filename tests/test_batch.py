@@ -0,0 +1,39 @@
+import pytest
+
+from wordsearch import _batch
+
+
+@pytest.mark.parametrize(
+    "name, content, message",
+    [
+        ("short.csv", "wordlist,output\nw1.txt\n", "output is missing"),
+        ("not_object.json", '["w1.txt"]', "must be an object"),
+        (
+            "negative.json",
+            '[{"wordlist": "w1.txt", "output": "a.txt", "size": "-5"}]',
+            "at least 1",
+        ),
+        ("zero.json", '[{"wordlist": "w1.txt", "output": "a.txt", "size": "0"}]', "at least 1"),
+        (
+            "zero_width.json",
+            '[{"wordlist": "w1.txt", "output": "a.txt", "width": 0}]',
+            "at least 1",
+        ),
+        ("big_seed.json", '[{"wordlist": "w1.txt", "output": "a.txt", "seed": 1e20}]', "64 bits"),
+    ],
+)
+def test_bad_manifest_entries_are_rejected(tmp_path, name, content, message):
+    manifest = tmp_path / name
+    manifest.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        _batch.load_manifest(manifest)
+
+
+def test_blank_word_list_fails_only_its_job(tmp_path):
+    (tmp_path / "blank.txt").write_text("  \n\n")
+    job = _batch.Job(tmp_path / "blank.txt", tmp_path / "out.txt", 5, 5, "easy", 1)
+
+    result = _batch._run_job(job, "random", "lists", False, None, True)
+
+    assert "no words" in result.error
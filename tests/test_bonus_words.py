@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from wordsearch import _bonus_words, _compiled_dictionary, _english_words
+from wordsearch._grid import Direction
+
+WORDS = ["ab", "aba", "abc", "bad", "cab", "dab", "bc", "cc", "dcba", "add"]
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("\n".join(WORDS) + "\n")
+    return _english_words.load_words([(word_file, 1)])
+
+
+@pytest.fixture(params=["in_memory", "compiled"])
+def automaton(request, dictionary, tmp_path):
+    if request.param == "in_memory":
+        return _english_words.automaton_for(dictionary)
+    compiled_file = tmp_path / "words.bin"
+    fingerprint = b"\x00" * 32
+    _compiled_dictionary.write(
+        compiled_file, dictionary.root, fingerprint, dictionary.max_word_length
+    )
+    return _compiled_dictionary.load(compiled_file, fingerprint)
+
+
+def _random_grid(seed, width, height):
+    rng = random.Random(seed)
+    return [[rng.choice("ABCD") for _ in range(width)] for _ in range(height)]
+
+
+def _brute_force_hits(grid, dictionary, allowed):
+    return {
+        hit
+        for y in range(len(grid))
+        for x in range(len(grid[0]))
+        for direction in Direction
+        for hit in _bonus_words.iter_hits_from(grid, dictionary, allowed, x, y, direction)
+    }
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("width, height", [(1, 1), (1, 6), (6, 1), (5, 7), (8, 8)])
+def test_find_all_hits_matches_per_cell_scan(dictionary, automaton, seed, width, height):
+    grid = _random_grid(seed, width, height)
+    allowed = _bonus_words.allowed_words(["cab"])
+
+    hits = _bonus_words.find_all_hits(grid, automaton, allowed)
+
+    assert len(hits) == len(set(hits))
+    assert set(hits) == _brute_force_hits(grid, dictionary, allowed)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_checker_follows_changes(dictionary, automaton, seed):
+    rng = random.Random(seed)
+    grid = _random_grid(seed, 7, 6)
+    allowed = _bonus_words.allowed_words(["bad"])
+    checker = _bonus_words.IncrementalChecker(grid, dictionary, automaton, allowed)
+
+    for _ in range(20):
+        x, y = rng.randrange(7), rng.randrange(6)
+        grid[y][x] = rng.choice("ABCD")
+        checker.cell_changed(x, y)
+
+        assert checker.hits == _brute_force_hits(grid, dictionary, allowed)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_count_hits_by_letter_matches_trying_each_letter(dictionary, seed):
+    rng = random.Random(seed)
+    grid = _random_grid(seed, 6, 6)
+    allowed = _bonus_words.allowed_words(["ab"])
+    x, y = rng.randrange(6), rng.randrange(6)
+
+    counts = _bonus_words.count_hits_by_letter(grid, dictionary, allowed, x, y, "ABCD")
+
+    for letter in "ABCD":
+        grid[y][x] = letter
+        through = set(_bonus_words.iter_hits_through(grid, dictionary, allowed, x, y))
+        assert counts[letter] == len(through)
+        assert through == {
+            hit for hit in _brute_force_hits(grid, dictionary, allowed) if (x, y) in hit.coords()
+        }
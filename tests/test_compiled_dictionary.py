@@ -0,0 +1,69 @@
+import pytest
+
+from wordsearch import _compiled_dictionary, _english_words
+
+WORDS = ["a", "ab", "abc", "bcd", "cat", "catalog", "dog", "ünïcode"]
+FINGERPRINT = bytes(range(32))
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("\n".join(WORDS) + "\n", encoding="utf-8")
+    return _english_words.load_words([(word_file, 1)])
+
+
+@pytest.fixture
+def compiled_file(tmp_path, dictionary):
+    file = tmp_path / "words.bin"
+    _compiled_dictionary.write(file, dictionary.root, FINGERPRINT, dictionary.max_word_length)
+    return file
+
+
+def _is_word(root, word):
+    node = root
+    for char in word:
+        node = node.advance(char)
+        if node is None:
+            return False
+    return node.is_terminal
+
+
+def test_round_trip(dictionary, compiled_file):
+    compiled = _compiled_dictionary.load(compiled_file, FINGERPRINT)
+
+    assert compiled is not None
+    assert compiled.fingerprint == FINGERPRINT
+    assert compiled.max_word_length == dictionary.max_word_length
+    for word in WORDS:
+        assert _is_word(compiled.root, word)
+    for word in ["", "b", "ca", "cata", "dogs", "unicode"]:
+        assert not _is_word(compiled.root, word)
+
+    in_memory = _compiled_dictionary.CompiledDictionary.from_trie(
+        dictionary.root, dictionary.max_word_length
+    )
+    text = "xcatalogabcdogünïcodea"
+    assert list(compiled.scan(text)) == list(in_memory.scan(text))
+
+
+def test_stale_fingerprint_is_ignored(compiled_file):
+    assert _compiled_dictionary.load(compiled_file, bytes(32)) is None
+
+
+@pytest.mark.parametrize("keep", [0, 10, 64, -1])
+def test_truncated_file_is_ignored(compiled_file, keep):
+    data = compiled_file.read_bytes()
+    compiled_file.write_bytes(data[:keep])
+
+    assert _compiled_dictionary.load(compiled_file, FINGERPRINT) is None
+
+
+def test_other_file_is_ignored(compiled_file):
+    compiled_file.write_bytes(b"not a dictionary".ljust(200, b"\x00"))
+
+    assert _compiled_dictionary.load(compiled_file, FINGERPRINT) is None
+
+
+def test_missing_file_is_ignored(tmp_path):
+    assert _compiled_dictionary.load(tmp_path / "missing.bin", FINGERPRINT) is None
@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import pathlib
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "bench", pathlib.Path(__file__).resolve().parent.parent / "benchmarks" / "bench.py"
+)
+bench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench)
+
+
+@pytest.mark.parametrize("module", list(bench.IMPORT_BUDGETS))
+def test_import_defers_heavy_modules(module):
+    assert bench.deferred_imports(module) == []
+
+
+# wall-clock timings depend on the machine and how busy it is, so only check them when asked to
+@pytest.mark.skipif(
+    not os.environ.get("WORDSEARCH_IMPORT_BUDGET"),
+    reason="set WORDSEARCH_IMPORT_BUDGET=1 to time imports",
+)
+@pytest.mark.parametrize("module", list(bench.IMPORT_BUDGETS))
+def test_import_time_within_budget(module):
+    (result,) = bench.bench_imports(repeats=5, modules=[module])
+
+    assert min(result.times) <= bench.IMPORT_BUDGETS[module]
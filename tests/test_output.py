@@ -0,0 +1,73 @@
+import io
+import struct
+import zlib
+
+import pytest
+
+from wordsearch import _output
+
+RECORDS = [
+    {
+        "name": "puzzles/über.txt",
+        "seed": _output.MAX_SEED,
+        "grid": ["CATX", "QDOG", "ZZÉZ"],
+        "answer_key": ["CAT ", " DOG", "  É "],
+        "word_coords": {
+            "cat": {"x": 0, "y": 0, "direction": "FORWARD"},
+            "dog": {"x": 1, "y": 1, "direction": "FORWARD"},
+            "té": {"x": 2, "y": 0, "direction": "DOWN"},
+        },
+    },
+    {"seed": _output.MIN_SEED, "grid": ["A"], "answer_key": [" "], "word_coords": {}},
+]
+
+
+def _archive(records):
+    file = io.BytesIO()
+    writer = _output.ArchiveWriter(file)
+    for record in records:
+        writer.write(record)
+    return file.getvalue()
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_pack_round_trip(record):
+    assert _output._unpack(_output._pack(record)) == record
+
+
+def test_archive_round_trip():
+    assert list(_output.read_archive(io.BytesIO(_archive(RECORDS)))) == RECORDS
+
+
+def test_seed_outside_int64_is_rejected():
+    with pytest.raises(ValueError, match="too big"):
+        _output._pack(dict(RECORDS[1], seed=_output.MAX_SEED + 1))
+
+
+def test_not_an_archive():
+    with pytest.raises(ValueError, match="Not a word search archive"):
+        list(_output.read_archive(io.BytesIO(b"{}\n")))
+
+
+@pytest.mark.parametrize("cut", [1, 3, 5, 20])
+def test_truncated_archive(cut):
+    data = _archive(RECORDS)
+
+    with pytest.raises(ValueError, match="truncated"):
+        list(_output.read_archive(io.BytesIO(data[:-cut])))
+
+
+def test_corrupt_record():
+    data = bytearray(_archive(RECORDS[1:]))
+    data[-3] ^= 0xFF  # inside the compressed payload, so zlib's checksum fails
+
+    with pytest.raises(ValueError, match="Archive record is corrupt"):
+        list(_output.read_archive(io.BytesIO(bytes(data))))
+
+
+def test_record_shorter_than_its_fields():
+    payload = zlib.compress(_output._pack(RECORDS[0])[:-4])
+    data = _output._MAGIC + struct.pack("<I", len(payload)) + payload
+
+    with pytest.raises(ValueError, match="Archive record is"):
+        list(_output.read_archive(io.BytesIO(data)))
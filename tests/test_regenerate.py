@@ -0,0 +1,62 @@
+import pytest
+
+from wordsearch import _bonus_words, _english_words, _generator, _placement
+
+
+@pytest.fixture
+def dictionary(tmp_path):
+    word_file = tmp_path / "words.txt"
+    word_file.write_text("ab\nxyz\n")
+    return _english_words.load_words([(word_file, 1)])
+
+
+def _filler_hits(puzzle, words, dictionary, allow_words=()):
+    """Bonus words that use at least one filler letter (the ones repair is meant to remove)."""
+    height = len(puzzle.grid)
+    width = len(puzzle.grid[0])
+    occupancy = _placement.Occupancy.from_placements(width, height, puzzle.word_coords)
+    hits = _bonus_words.find_all_hits(
+        puzzle.grid,
+        _english_words.automaton_for(dictionary),
+        _bonus_words.allowed_words(words, allow_words),
+    )
+    return [hit for hit in hits if not all(occupancy.is_placed(x, y) for x, y in hit.coords())]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_removing_a_word_rechecks_what_it_allowed(dictionary, seed):
+    previous = _generator.generate_puzzle(
+        ["abqqq", "dog"], 15, 15, "hard", seed=seed, dictionary=dictionary
+    )
+
+    puzzle = _generator.regenerate_puzzle(
+        previous, ["dog"], "hard", seed=seed, dictionary=dictionary, previous_allow_words=()
+    )
+
+    assert puzzle.word_coords["dog"] == previous.word_coords["dog"]
+    assert _filler_hits(puzzle, ["dog"], dictionary) == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dropping_an_allow_word_rechecks_it(dictionary, seed):
+    previous = _generator.generate_puzzle(
+        ["dog"],
+        15,
+        15,
+        "hard",
+        seed=seed,
+        dictionary=dictionary,
+        fill_mode="random",
+        allow_words=["ab"],
+    )
+
+    puzzle = _generator.regenerate_puzzle(
+        previous,
+        ["dog", "cat"],
+        "hard",
+        seed=seed,
+        dictionary=dictionary,
+        previous_allow_words=["ab"],
+    )
+
+    assert _filler_hits(puzzle, ["dog", "cat"], dictionary) == []
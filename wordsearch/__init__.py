@@ -0,0 +1,36 @@
+"""Generate word searches.
+
+``wordsearch.generate`` makes a puzzle from Python without going through the
+command line (or importing click); ``python -m wordsearch --help`` covers the CLI.
+"""
+
+import typing
+
+if typing.TYPE_CHECKING:
+    from wordsearch._generator import Puzzle
+
+
+def generate(
+    words: typing.Iterable[str],
+    width: typing.Optional[int] = None,
+    height: typing.Optional[int] = None,
+    hardness_level: str = "medium",
+    seed: typing.Optional[int] = None,
+    **options: typing.Any,
+) -> "Puzzle":
+    """Generate a word search for ``words`` (cleaned the way the CLI cleans them).
+
+    Any other keyword arguments (``fill_mode``, ``auto_size``, ``allow_words``,
+    ``cache``, ...) are passed on to ``_generator.generate_puzzle``. Returns a
+    ``Puzzle`` with the grid, answer key, word positions and the seed used.
+    """
+    from wordsearch import _generator  # imported here so ``import wordsearch`` stays instant
+
+    return _generator.generate_puzzle(
+        _generator.clean_words(words),
+        width=width,
+        height=height,
+        hardness_level=hardness_level,
+        seed=seed,
+        **options,
+    )
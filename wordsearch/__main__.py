@@ -1,190 +1,357 @@
-import copy
-import enum
-import math
+# Modules only some commands need (asyncio, multiprocessing, cProfile, ...) are imported
+# inside those commands, so a one-off puzzle doesn't wait on them.
+import contextlib
+import gc
+import json
 import pathlib
-import pprint
 import random
-import re
 import typing
-import string
 
 import click
 
-from wordsearch import _english_words
+from wordsearch import (
+    _array_grid,
+    _bonus_words,
+    _cache,
+    _english_words,
+    _generator,
+    _grid,
+    _output,
+    _stats,
+)
 
 _MODULE_DIR = pathlib.Path(__file__).parent
-_CHECK_FOR_OTHER_WORDS = _english_words.CHECK_FOR_OTHER_WORDS
-
-
-class _Direction(enum.Enum):
-    """Direction of word placement."""
-
-    FORWARD = 0
-    REVERSE = enum.auto()
-    DOWN = enum.auto()
-    UP = enum.auto()
-    RIGHT_DOWN = enum.auto()
-    RIGHT_UP = enum.auto()
-    LEFT_DOWN = enum.auto()
-    LEFT_UP = enum.auto()
-
-
-def _print_grid(grid: typing.List[typing.List[str]], file=None):
-    """Print the grid to the console."""
-    print(" " * 3, end=" ", file=file)
-    for i in range(len(grid[0])):
-        print(chr(ord("A") + i), end=" ", file=file)
-    print("", file=file)
-
-    for i, row in enumerate(grid):
-        print(f"{i+1:> 3}", " ".join([ch or " " for ch in row]), file=file)
-
-
-def _make_grid(width: int, height: int) -> typing.List[typing.List[str]]:
-    """Create a grid of the given width and height."""
-    return [["" for _ in range(width)] for _ in range(height)]
-
-
-def _place_word(grid: typing.List[typing.List[str]], word: str, direction: _Direction):
-    """Place a word in the grid in the given direction."""
-    word_length = len(word)
-    grid_height = len(grid)
-    grid_width = len(grid[0])
-
-    if all(
-        [
-            word_length > grid_width,
-            word_length > grid_height,
-            (
-                word_length > math.hypot(grid_width, grid_height)
-                and direction
-                in {
-                    _Direction.RIGHT_DOWN,
-                    _Direction.RIGHT_UP,
-                    _Direction.LEFT_DOWN,
-                    _Direction.LEFT_UP,
-                }
-            ),
-        ]
-    ):
-        raise ValueError("Word is too long for grid.")
-
-    attempts = 500
-    for _ in range(attempts):
-        if direction == _Direction.FORWARD:
-            start_x = random.randint(0, grid_width - 1 - word_length)
-            start_y = random.randint(0, grid_height - 1)
-            for i, c in enumerate(word):
-                current_char = grid[start_y][start_x + i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y][start_x + i] = c
-                break
-
-        elif direction == _Direction.REVERSE:
-            start_x = random.randint(word_length, grid_width - 1)
-            start_y = random.randint(0, grid_height - 1)
-            for i, c in enumerate(word):
-                current_char = grid[start_y][start_x - i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y][start_x - i] = c
-                break
-        elif direction == _Direction.DOWN:
-            start_x = random.randint(0, grid_width - 1)
-            start_y = random.randint(0, grid_height - 1 - word_length)
-            for i, c in enumerate(word):
-                current_char = grid[start_y + i][start_x]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y + i][start_x] = c
-                break
-        elif direction == _Direction.UP:
-            start_x = random.randint(0, grid_width - 1)
-            start_y = random.randint(word_length - 1, grid_height - 1)
-            for i, c in enumerate(word):
-                current_char = grid[start_y - i][start_x]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y - i][start_x] = c
-                break
-        elif direction == _Direction.RIGHT_DOWN:
-            start_x = random.randint(0, grid_width - 1 - word_length)
-            start_y = random.randint(0, grid_height - 1 - word_length)
-            # break
-            for i, c in enumerate(word):
-                current_char = grid[start_y + i][start_x + i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y + i][start_x + i] = c
-                break
-        elif direction == _Direction.RIGHT_UP:
-            start_x = random.randint(0, grid_width - 1 - word_length)
-            start_y = random.randint(word_length - 1, grid_height - 1)
-            # break
-            for i, c in enumerate(word):
-                current_char = grid[start_y - i][start_x + i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y - i][start_x + i] = c
-                break
-        elif direction == _Direction.LEFT_DOWN:
-            start_x = random.randint(word_length, grid_width - 1)
-            start_y = random.randint(0, grid_height - 1 - word_length)
-            for i, c in enumerate(word):
-                current_char = grid[start_y + i][start_x - i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
-            else:
-                for i, c in enumerate(word):
-                    grid[start_y + i][start_x - i] = c
-                break
-        elif direction == _Direction.LEFT_UP:
-            start_x = random.randint(word_length - 1, grid_width - 1)
-            start_y = random.randint(word_length - 1, grid_height - 1)
-            for i, c in enumerate(word):
-                current_char = grid[start_y - i][start_x - i]
-                space_available = current_char == "" or current_char == c
-                if not space_available:
-                    break
+
+
+_ALLOW_WORDS_OPTION = click.option(
+    "--allow-words",
+    "allow_words_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    help=(
+        "File of words (one per line) that are fine to find in the puzzle, so they aren't treated "
+        "as bonus words."
+    ),
+)
+_STATS_OPTION = click.option(
+    "--stats",
+    "stats_format",
+    type=click.Choice(["json", "text"], case_sensitive=False),
+    help=(
+        "Report how long each stage took and what it did (placement attempts, repair iterations, "
+        "...) to stderr."
+    ),
+)
+
+
+def _cache_options(command):
+    """Add --cache, --cache-dir and --cache-size to ``command``."""
+    command = click.option(
+        "--cache-size",
+        type=click.IntRange(min=1),
+        default=_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+        help=(
+            "How many MB of cached puzzles to keep before removing the least recently used. "
+            "(default: 100)"
+        ),
+    )(command)
+    command = click.option(
+        "--cache-dir",
+        type=click.Path(file_okay=False, path_type=pathlib.Path),
+        default=_cache.DEFAULT_CACHE_DIR,
+        help=f"Where to keep cached puzzles. (default: {_cache.DEFAULT_CACHE_DIR})",
+    )(command)
+    return click.option(
+        "--cache",
+        "use_cache",
+        is_flag=True,
+        help=(
+            "Keep generated puzzles on disk, so asking for the same one again (same words, size, "
+            "hardness and seed) reads it back instead of generating it."
+        ),
+    )(command)
+
+
+def _make_cache(
+    use_cache: bool, cache_dir: pathlib.Path, cache_size: int
+) -> typing.Optional[_cache.ResultCache]:
+    return _cache.ResultCache(cache_dir, cache_size * 1024 * 1024) if use_cache else None
+
+
+def _read_allow_words(file: typing.Optional[pathlib.Path]) -> typing.Tuple[str, ...]:
+    if not file:
+        return ()
+    return _generator.clean_words(
+        line for line in file.read_text().splitlines() if not line.startswith("#")
+    )
+
+
+class _DefaultCommandGroup(click.Group):
+    """A group that runs ``generate`` when no subcommand is given.
+
+    That way ``wordsearch --word ...`` keeps working.
+    """
+
+    def parse_args(self, ctx: click.Context, args: typing.List[str]) -> typing.List[str]:
+        if not args or (args[0] not in self.commands and args[0] not in ctx.help_option_names):
+            args = ["generate", *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultCommandGroup)
+@click.pass_context
+def main(ctx: click.Context) -> None:
+    """Generate word searches."""
+    # a loaded dictionary is hundreds of thousands of objects that live until the process
+    # ends, so take them out of the garbage collector's hands rather than have exit walk them
+    ctx.call_on_close(gc.freeze)
+
+
+@main.command("compile-dictionary")
+@click.option(
+    "--output",
+    type=click.Path(exists=False, path_type=pathlib.Path),
+    default=_english_words.COMPILED_WORDS_FILE,
+    help=(
+        "Where to write the compiled dictionary. (default: next to the word files, where it is "
+        "picked up automatically)"
+    ),
+)
+def compile_dictionary(output: pathlib.Path) -> None:
+    """Pre-build the dictionary of bonus words so generating a puzzle doesn't have to."""
+    if not _english_words.check_for_other_words():
+        raise click.UsageError(
+            "Neither offensive_words.txt nor all_english_words.txt is present to compile."
+        )
+    node_count, edge_count = _english_words.compile_dictionary(output)
+    click.echo(f"Wrote {node_count} nodes and {edge_count} edges to {output}")
+
+
+@main.command("batch")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path))
+@click.option(
+    "--jobs",
+    "processes",
+    type=click.IntRange(min=1),
+    help="How many puzzles to generate at once. (default: one per CPU)",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(_output.FORMATS, case_sensitive=False),
+    default="text",
+    help=(
+        "text writes each puzzle and answer key to its own files; jsonl and archive write every "
+        "puzzle to --output-file instead, one after another as they finish. (default: text)"
+    ),
+)
+@click.option(
+    "--output-file",
+    type=click.Path(dir_okay=False, allow_dash=True, path_type=pathlib.Path),
+    help=(
+        "With --output-format jsonl or archive, the file to write every puzzle to (- for stdout). "
+        "Each is named by its entry's output."
+    ),
+)
+@_STATS_OPTION
+@_cache_options
+def batch(
+    manifest: pathlib.Path,
+    processes: typing.Optional[int],
+    output_format: str,
+    output_file: typing.Optional[pathlib.Path],
+    stats_format: typing.Optional[str],
+    use_cache: bool,
+    cache_dir: pathlib.Path,
+    cache_size: int,
+) -> None:
+    """Generate many word searches in parallel from a MANIFEST (JSON or CSV).
+
+    Each entry needs a wordlist file and an output file (relative to the manifest) and can set
+    size (30 or 30x20) or width/height, hardness and seed. The answer key for each
+    puzzle is written next to it as <output>_answer_key.
+    """
+    from wordsearch import _batch
+
+    streaming = output_format != "text"
+    if streaming and not output_file:
+        raise click.UsageError(f"--output-format {output_format} needs --output-file.")
+    if output_file and not streaming:
+        raise click.UsageError("--output-file only applies with --output-format jsonl or archive.")
+    try:
+        jobs = _batch.load_manifest(manifest)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    failures = 0
+    stats = _stats.Stats()
+    cache = _make_cache(use_cache, cache_dir, cache_size)
+    to_stdout = streaming and str(output_file) == "-"
+    with (
+        _output.open_writer(output_file, output_format) if streaming else contextlib.nullcontext()
+    ) as writer:
+        results = _batch.run_batch(
+            jobs,
+            processes,
+            collect_stats=stats_format is not None,
+            cache=cache,
+            write_files=not streaming,
+        )
+        for result in results:
+            if result.stats:
+                stats.merge(result.stats)
+            if result.error:
+                failures += 1
+                click.echo(f"Failed {result.job.output}: {result.error}", err=True)
+                continue
+            if streaming:
+                writer.write(dict(name=str(result.job.output), **result.puzzle))
+                click.echo(f"Generated {result.job.output} (seed {result.job.seed})", err=to_stdout)
             else:
-                for i, c in enumerate(word):
-                    grid[start_y - i][start_x - i] = c
-                break
-    else:
-        raise ValueError(
-            f"Could not place word in grid after {attempts} attempts ☹. Word: {word}, Direction: {direction}"
+                click.echo(f"Wrote {result.job.output} (seed {result.job.seed})")
+    if stats_format:
+        click.echo(stats.format(stats_format), err=True)
+    if failures:
+        raise click.ClickException(f"{failures} of {len(jobs)} word searches failed.")
+
+
+@main.command("verify")
+@click.argument("paths", nargs=-1, required=True)
+@click.option(
+    "--report",
+    type=click.File("w"),
+    default="-",
+    help="Where to write the report, one JSON object per puzzle per line. (default: stdout)",
+)
+@click.option(
+    "--jobs",
+    "processes",
+    type=click.IntRange(min=1),
+    help="How many puzzles to check at once. (default: one per CPU)",
+)
+@_ALLOW_WORDS_OPTION
+def verify(
+    paths: typing.Tuple[str, ...],
+    report: typing.TextIO,
+    processes: typing.Optional[int],
+    allow_words_file: typing.Optional[pathlib.Path],
+) -> None:
+    """Check existing word searches for bonus words.
+
+    PATHS can be puzzle files, directories (every .txt file in them) or glob patterns
+    (quote them; ** matches subdirectories). Puzzles can be as written by this tool
+    or plain blocks of letters. Every dictionary word found is reported with where
+    it starts (x and y from 0) and which way it reads.
+    """
+    if not _english_words.check_for_other_words():
+        raise click.UsageError(
+            "Neither offensive_words.txt nor all_english_words.txt is present to check against."
         )
+    from wordsearch import _verify
+
+    try:
+        files = _verify.find_puzzle_files(paths)
+    except ValueError as e:
+        raise click.UsageError(str(e))
+
+    with_hits = 0
+    unreadable = 0
+    allowed = _bonus_words.allowed_words((), _read_allow_words(allow_words_file))
+    for result in _verify.verify_files(files, report, processes, allowed):
+        if "error" in result:
+            unreadable += 1
+            click.echo(f"Could not read {result['file']}: {result['error']}", err=True)
+        elif result["hits"]:
+            with_hits += 1
+    click.echo(
+        f"Checked {len(files)} puzzles: {with_hits} have bonus words, "
+        f"{unreadable} could not be read.",
+        err=True,
+    )
 
-    return start_x, start_y
+
+@main.command("unpack")
+@click.argument("archive", type=click.File("rb"))
+@click.option(
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="Where to write the puzzles, one JSON object per line. (default: stdout)",
+)
+def unpack(archive: typing.BinaryIO, output: typing.TextIO) -> None:
+    """Turn an ARCHIVE written with --output-format archive back into JSON Lines."""
+    try:
+        for record in _output.read_archive(archive):
+            output.write(json.dumps(record) + "\n")
+    except ValueError as e:
+        raise click.ClickException(f"{archive.name}: {e}")
+
+
+@main.command("serve")
+@click.option("--host", default="127.0.0.1", help="Address to listen on. (default: 127.0.0.1)")
+@click.option("--port", type=int, default=8765, help="Port to listen on. (default: 8765)")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="How many puzzles can be generated at once. (default: one per CPU)",
+)
+@click.option(
+    "--timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=60,
+    help=(
+        "Seconds to spend on one puzzle before answering 503 and freeing its worker. (default: 60)"
+    ),
+)
+@_cache_options
+def serve(
+    host: str,
+    port: int,
+    workers: typing.Optional[int],
+    timeout: float,
+    use_cache: bool,
+    cache_dir: pathlib.Path,
+    cache_size: int,
+) -> None:
+    """Keep the dictionary loaded and generate word searches over a local HTTP/JSON API.
+
+    POST /generate with {"words": [...], "width": .., "height": .., "hardness": .., "seed": ..}
+    (only words is required) to get back the grid, answer key and word coordinates.
+    """
+    import asyncio
+
+    from wordsearch import _server
+
+    try:
+        asyncio.run(
+            _server.serve(
+                host,
+                port,
+                workers,
+                ready=click.echo,
+                cache=_make_cache(use_cache, cache_dir, cache_size),
+                timeout=timeout,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
 
 
-@click.command()
+@main.command("generate")
 @click.option(
     "--output",
     type=click.Path(exists=False, path_type=pathlib.Path),
     default=_MODULE_DIR / "wordsearch.txt",
     help="Output file name.",
 )
+@click.option(
+    "--output-format",
+    type=click.Choice(_output.FORMATS, case_sensitive=False),
+    default="text",
+    help=(
+        "text writes the grid to --output and shows the answer key; jsonl writes the whole puzzle "
+        "(grid, answer key, word positions, seed) to --output as a line of JSON, and archive as a "
+        "compact binary record (read it back with `wordsearch unpack`). (default: text)"
+    ),
+)
 @click.option(
     "--word",
     # name="words",
@@ -202,12 +369,20 @@ def _place_word(grid: typing.List[typing.List[str]], word: str, direction: _Dire
     "--hardness-level",
     type=click.Choice(["easy", "medium", "hard"], case_sensitive=False),
     default="medium",
-    help="Hardness level of the word search. Easy has all words left to right; medium adds backwards, down, and right-down; hard adds right-up and left-(up/down). (default: medium)",
+    help=(
+        "Hardness level of the word search. Easy has all words left to right; medium adds "
+        "backwards, down, and right-down; hard adds right-up and left-(up/down). (default: medium)"
+    ),
 )
 @click.option(
     "--random-seed",
-    type=int,
-    help="This is fancy computer speak for 'the staring point of the random numbers'. If you want to be able to reproduce the same word search, use this option. If you don't care, just leave it off (we will print the seed that is chosen so you can recreate later if you want).",
+    type=click.IntRange(_output.MIN_SEED, _output.MAX_SEED),
+    help=(
+        "This is fancy computer speak for 'the staring point of the random numbers'. If you want "
+        "to be able to reproduce the same word search, use this option. If you don't care, just "
+        "leave it off (we will print the seed that is chosen so you can recreate later if you "
+        "want)."
+    ),
 )
 @click.option(
     "--height",
@@ -219,283 +394,245 @@ def _place_word(grid: typing.List[typing.List[str]], word: str, direction: _Dire
     type=int,
     help="Width of the word search. If nothing is provided, will default to longest word + 2",
 )
-def main(
+@click.option(
+    "--fill-mode",
+    type=click.Choice(["constrained", "random"], case_sensitive=False),
+    default="constrained",
+    help=(
+        "How to pick filler letters when checking for bonus words. Constrained only uses letters "
+        "that don't spell a word with their neighbors; random picks any letter and fixes bonus "
+        "words afterwards. (default: constrained)"
+    ),
+)
+@click.option(
+    "--grid-backend",
+    type=click.Choice(["lists", "numpy"], case_sensitive=False),
+    default="lists",
+    help=(
+        "How the grid is stored while placing words. numpy (optional, needs numpy installed) "
+        "checks every spot for a word at once, which makes very large grids practical. "
+        "(default: lists)"
+    ),
+)
+@click.option(
+    "--auto-size",
+    is_flag=True,
+    help=(
+        "Use the smallest grid the words fit in instead of longest word + 2 (a --width or --height "
+        "given is kept, and only the other side is sized)."
+    ),
+)
+@click.option(
+    "--target-density",
+    type=click.FloatRange(min=0, max=1, min_open=True),
+    help=(
+        "With --auto-size, size the grid so about this fraction of it is search-word letters (e.g. "
+        "0.5) instead of as small as possible."
+    ),
+)
+@_ALLOW_WORDS_OPTION
+@click.option(
+    "--scan-jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    help=(
+        "Processes to scan for bonus words with, for poster-size grids (200x200 and up; smaller "
+        "grids are always scanned in one). (default: 1)"
+    ),
+)
+@click.option(
+    "--save-state",
+    type=click.Path(exists=False, dir_okay=False, path_type=pathlib.Path),
+    help=(
+        "Also save the puzzle (grid, word positions, seed, hardness level and allowed words) to "
+        "this JSON file, for --from-state later."
+    ),
+)
+@click.option(
+    "--from-state",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    help=(
+        "Update a puzzle saved with --save-state for the new word list instead of starting over: "
+        "kept words stay where they are, only new words are placed and only the cells that change "
+        "are refilled. Uses the saved hardness level and seed unless given."
+    ),
+)
+@click.option(
+    "--race",
+    type=click.IntRange(min=1),
+    default=1,
+    help=(
+        "Generate with this many seeds (the --random-seed and others derived from it) at once in "
+        "separate processes and keep whichever finishes first, to avoid the occasional seed that "
+        "takes much longer. The seed that won is printed. (default: 1)"
+    ),
+)
+@_cache_options
+@_STATS_OPTION
+@click.option(
+    "--profile",
+    type=click.Path(exists=False, dir_okay=False, path_type=pathlib.Path),
+    help=(
+        "Write a cProfile dump of generating the puzzle to this file (view it with pstats or "
+        "snakeviz)."
+    ),
+)
+def generate(
     output: typing.Optional[pathlib.Path],
+    output_format: str,
     words: typing.Tuple[str, ...],
     wordlist_file: typing.Optional[pathlib.Path],
     random_seed: typing.Optional[int],
     hardness_level: str,
     height: typing.Optional[int],
     width: typing.Optional[int],
+    fill_mode: str,
+    grid_backend: str,
+    auto_size: bool,
+    target_density: typing.Optional[float],
+    allow_words_file: typing.Optional[pathlib.Path],
+    scan_jobs: int,
+    save_state: typing.Optional[pathlib.Path],
+    from_state: typing.Optional[pathlib.Path],
+    race: int,
+    use_cache: bool,
+    cache_dir: pathlib.Path,
+    cache_size: int,
+    stats_format: typing.Optional[str],
+    profile: typing.Optional[pathlib.Path],
 ) -> None:
-    """Generate word searches."""
+    """Generate a word search (the default when no command is given)."""
+    previous = None
+    if from_state:
+        if width or height or auto_size:
+            raise click.UsageError(
+                "--from-state keeps the saved grid's size; "
+                "leave off --width, --height and --auto-size."
+            )
+        if race > 1:
+            raise click.UsageError("--race only applies to new puzzles, not --from-state.")
+        try:
+            state = json.loads(from_state.read_text())
+            previous = _generator.Puzzle.from_dict(state)
+        except (ValueError, KeyError) as e:
+            raise click.UsageError(f"Could not read {from_state}: {e}")
+        context = click.get_current_context()
+        if context.get_parameter_source("hardness_level") == click.core.ParameterSource.DEFAULT:
+            hardness_level = state.get("hardness", hardness_level)
+        if random_seed is None:
+            random_seed = previous.seed
+            if (
+                not isinstance(random_seed, int)
+                or not _output.MIN_SEED <= random_seed <= _output.MAX_SEED
+            ):
+                raise click.UsageError(
+                    f"Could not read {from_state}: seed must be a 64-bit integer"
+                )
+
     if random_seed is None:
         random_seed = random.randint(0, 2**10 - 1)
-    random.seed(random_seed)
 
     if not words and not wordlist_file:
         raise click.UsageError("Please provide at least one word or a wordlist file.")
     if words and wordlist_file:
-        raise click.UsageError(
-            "Please provide either words or a wordlist file, not both."
-        )
+        raise click.UsageError("Please provide either words or a wordlist file, not both.")
+    if auto_size and width and height:
+        raise click.UsageError("--auto-size needs at least one of --width and --height left off.")
+    if target_density and not auto_size:
+        raise click.UsageError("--target-density only applies with --auto-size.")
+    if grid_backend == "numpy" and not _array_grid.AVAILABLE:
+        raise click.UsageError("--grid-backend numpy needs numpy installed (pip install numpy).")
 
     if wordlist_file:
         with wordlist_file.open("r") as f:
-            words = tuple(line.strip() for line in f if line.strip())
-    
-    numbers_in_wordlist = set()
-    for word in words:
-        numbers_in_wordlist.update([str(find) for find in re.findall(r"\d", word)])
-
-    if any(" " in word for word in words):
-        print("Removing spaces from within words, as that prints funny")
-        words = tuple(word.replace(" ", "") for word in words)
-
-    click.echo(f"Using random seed: {random_seed}")
-
-    if not height:
-        height = max(len(word) for word in words) + 2
-    if not width:
-        width = max(len(word) for word in words) + 2
-
-    direction_options = {
-        "easy": [_Direction.FORWARD],
-        "medium": [
-            _Direction.FORWARD,
-            _Direction.REVERSE,
-            _Direction.DOWN,
-            _Direction.RIGHT_DOWN,
-        ],
-        "hard": list(_Direction),
-    }
-
-    grid = _make_grid(width, height)
-    word_coords = _fill_in_grid(
-        words, hardness_level, height, width, grid, direction_options
-    )
-
-    _safe_random_fill(words, height, width, grid, word_coords, numbers_to_include=numbers_in_wordlist)
-
-    pprint.pprint(word_coords)
-
-    # Write the grid to the output file
-    with output.open("w") as f:
-        _print_grid(grid, file=f)
-
-
-def _safe_random_fill(words, height, width, grid, coords, numbers_to_include=()):
-    """Fill the grid with random letters, avoiding the words already placed."""
-
-    used_coords = set()
-    for word, (word_x, word_y, direction) in coords.items():
-        if direction == _Direction.FORWARD:
-            for i in range(len(word)):
-                used_coords.add((word_x + i, word_y))
-        elif direction == _Direction.REVERSE:
-            for i in range(len(word)):
-                used_coords.add((word_x - i, word_y))
-        elif direction == _Direction.DOWN:
-            for i in range(len(word)):
-                used_coords.add((word_x, word_y + i))
-        elif direction == _Direction.UP:
-            for i in range(len(word)):
-                used_coords.add((word_x, word_y - i))
-        elif direction == _Direction.RIGHT_DOWN:
-            for i in range(len(word)):
-                used_coords.add((word_x + i, word_y + i))
-        elif direction == _Direction.RIGHT_UP:
-            for i in range(len(word)):
-                used_coords.add((word_x + i, word_y - i))
-        elif direction == _Direction.LEFT_DOWN:
-            for i in range(len(word)):
-                used_coords.add((word_x - i, word_y + i))
-        elif direction == _Direction.LEFT_UP:
-            for i in range(len(word)):
-                used_coords.add((word_x - i, word_y - i))
-        
-
-    answer_key = copy.deepcopy(grid)
-
-    # Fill in the rest of the grid with random letters
-    alphabet = string.ascii_uppercase + string.ascii_uppercase + "".join(numbers_to_include)
-    for y in range(height):
-        for x in range(width):
-            if grid[y][x] == "":
-                grid[y][x] = random.choice(alphabet)
-
-    if _CHECK_FOR_OTHER_WORDS:
-        used_coordinates = set()
-        changed_coordinates = set()
-        while coords_to_change := _are_other_words_in_grid(
-            grid, words, ignored_coords=used_coordinates
-        ):
-            for x, y in coords_to_change:
-                if (x, y) not in used_coords and (x, y) not in changed_coordinates:
-                    grid[y][x] = random.choice([o for o in alphabet if o != grid[y][x]])
-                    changed_coordinates.add((x, y))
-                    break
+            words = tuple(f)
+
+    # a puzzle streamed to stdout has to be the only thing written there
+    to_stdout = output_format != "text" and str(output) == "-"
+
+    def log(message: str):
+        click.echo(message, err=to_stdout)
+
+    if any(" " in word.strip() for word in words):
+        log("Removing spaces from within words, as that prints funny")
+    words = _generator.clean_words(words)
+    if not words:
+        raise click.UsageError("Every word given was blank; please provide at least one word.")
+
+    log(f"Using random seed: {random_seed}")
+
+    stats = _stats.Stats() if stats_format else _stats.NO_STATS
+    profiler = None
+    if profile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if previous:
+            puzzle = _generator.regenerate_puzzle(
+                previous,
+                words,
+                hardness_level=hardness_level,
+                seed=random_seed,
+                fill_mode=fill_mode,
+                log=log,
+                stats=stats,
+                allow_words=_read_allow_words(allow_words_file),
+                previous_allow_words=state.get("allow_words"),
+            )
+        else:
+            options = dict(
+                width=width,
+                height=height,
+                hardness_level=hardness_level,
+                fill_mode=fill_mode,
+                grid_backend=grid_backend,
+                auto_size=auto_size,
+                target_density=target_density,
+                allow_words=_read_allow_words(allow_words_file),
+                scan_processes=scan_jobs,
+                cache=_make_cache(use_cache, cache_dir, cache_size),
+            )
+            if race > 1:
+                from wordsearch import _race
+
+                puzzle = _race.race_puzzle(
+                    words, race, seed=random_seed, log=log, stats=stats, **options
+                )
             else:
-                used_coordinates.update(
-                    coords_to_change
-                )  # they're all used, don't keep checking
-
-    for y in range(height):
-        for x in range(width):
-            if answer_key[y][x] != "" and answer_key[y][x] != grid[y][x]:
-                raise ValueError(f"Ah!!! We changed a letter in the answer key! -> ({x}, {y}) {answer_key[y][x]} -> {grid[y][x]}")
-    
-    _print_grid(answer_key)
-
-def _are_other_words_in_grid(grid, words, ignored_coords=None):
-    """Check if any other words are in the grid."""
-    # for each coordinate, check if is start of a word in the trie but not in words
-    # if so, return True
-    _english_words.load_in_all_words()
-    height = len(grid)
-    width = len(grid[0])
-    for y in range(height):
-        for x in range(width):
-            if (x, y) in ignored_coords:
-                continue
-
-            for direction in list(_Direction):
-                word = grid[y][x]
-                if direction == _Direction.FORWARD:
-                    for i in range(width - x - 1):
-                        char = grid[y][x + i + 1]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.FORWARD, word, x, y)
-                            return [(x + i, y) for i in range(len(word))]
-
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.FORWARD, word, x, y)
-                        return [(x + i, y) for i in range(len(word))]
-                elif direction == _Direction.REVERSE:
-                    for i in range(x, 0, -1):
-                        if i - 1 < 0:
-                            break
-                        char = grid[y][i - 1]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.REVERSE, word, x, y)
-                            return [(x - i, y) for i in range(len(word))]
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.REVERSE, word, x, y)
-                        return [(x - i, y) for i in range(len(word))]
-
-                elif direction == _Direction.DOWN:
-                    for i in range(height - y - 1):
-                        char = grid[y + i + 1][x]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.DOWN, word, x, y)
-                            return [(x, y + i) for i in range(len(word))]
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.DOWN, word, x, y)
-                        return [(x, y + i) for i in range(len(word))]
-                elif direction == _Direction.UP:
-                    for i in range(y, 0, -1):
-                        if y - i - 1 < 0:
-                            break
-                        char = grid[y - i - 1][x]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.UP, word, x, y)
-                            return [(x, y - i) for i in range(len(word))]
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.UP, word, x, y)
-                        return [(x, y - i) for i in range(len(word))]
-                elif direction == _Direction.RIGHT_DOWN:
-                    for i in range(min(width - x - 1, height - y - 1)):
-                        char = grid[y + i + 1][x + i + 1]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.RIGHT_DOWN, word, x, y)
-                            return [(x + i, y + i) for i in range(len(word))]
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.RIGHT_DOWN, word, x, y)
-                        return [(x + i, y + i) for i in range(len(word))]
-                elif direction == _Direction.RIGHT_UP:
-                    for i in range(min(width - x - 1, y)):
-                        if y - i - 1 < 0:
-                            break
-                        char = grid[y - i - 1][x + i + 1]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.RIGHT_UP, word, x, y)
-                            return [(x + i, y - i) for i in range(len(word))]
-
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.RIGHT_UP, word, x, y)
-                        return [(x + i, y - i) for i in range(len(word))]
-                elif direction == _Direction.LEFT_DOWN:
-                    debug_coords = []
-                    for i in range(min(x, height - y - 1)):
-                        if (x - i - 1) < 0:
-                            break
-                        coord = (y + i + 1, x - i - 1)
-                        debug_coords.append(coord)
-                        char = grid[coord[0]][coord[1]]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.LEFT_DOWN, word, x, y)
-                            return [(x - i, y + i) for i in range(len(word))]
-
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.LEFT_DOWN, word, x, y)
-                        return [(x - i, y + i) for i in range(len(word))]
-                elif direction == _Direction.LEFT_UP:
-                    for i in range(min(x, y)):
-                        if (x - i - 1) < 0 or (y - i - 1) < 0:
-                            break
-                        char = grid[y - i - 1][x - i - 1]
-                        if not (_english_words._ROOT.find_start_of_word(word + char)):
-                            break
-                        word += char
-                        if _is_word_and_not_ok(words, word):
-                            print(_Direction.LEFT_UP, word, x, y)
-                            return [(x - i, y - i) for i in range(len(word))]
-
-                    if _is_word_and_not_ok(words, word):
-                        print(_Direction.LEFT_UP, word, x, y)
-                        return [(x - i, y - i) for i in range(len(word))]
-    return False
-
-
-def _is_word_and_not_ok(words, word):
-    result = (
-        _english_words._ROOT.find_word(word)
-        and word not in words
-        and not any(search_word.upper().startswith(word) for search_word in words)
-    )
-    return result
-
-
-def _fill_in_grid(words, hardness_level, height, width, grid, direction_options):
-    result = {}
-    for word in words:
-        direction = random.choice(direction_options[hardness_level])
-        result[word] = *_place_word(grid, word.upper(), direction), direction
+                puzzle = _generator.generate_puzzle(
+                    words, seed=random_seed, log=log, stats=stats, **options
+                )
+    except ValueError as e:  # the words don't fit, or bonus words were left after repairing
+        raise click.ClickException(str(e))
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile)
+    if output_format == "text":
+        _grid.print_grid(puzzle.answer_key)
+
+        import pprint
+
+        pprint.pprint(puzzle.word_coords)
+
+        # Write the grid to the output file
+        with output.open("w") as f:
+            _grid.print_grid(puzzle.grid, file=f)
+    else:
+        with _output.open_writer(output, output_format) as writer:
+            writer.write(puzzle.as_dict())
+    if save_state:
+        saved = dict(
+            puzzle.as_dict(),
+            hardness=hardness_level,
+            allow_words=list(_read_allow_words(allow_words_file)),
+        )
+        save_state.write_text(json.dumps(saved, indent=2))
 
-    return result
+    if stats_format:
+        click.echo(stats.format(stats_format), err=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+"""An optional numpy-backed grid, for placing words in very large puzzles.
+
+Cells hold uint8 character codes with 0 meaning empty. numpy isn't a dependency of
+wordsearch, so this is only usable if it has been installed separately
+(``AVAILABLE`` says whether it was). It is only imported once an array grid is
+made, since it takes longer to import than most puzzles take to generate.
+"""
+
+import importlib.util
+import random
+import sys
+import typing
+
+from wordsearch._grid import Direction, Grid
+
+AVAILABLE = importlib.util.find_spec("numpy") is not None  # optional dependency
+EMPTY = 0
+
+
+def make_grid(width: int, height: int):
+    """Create an empty array-backed grid of the given width and height."""
+    import numpy
+
+    return numpy.zeros((height, width), dtype=numpy.uint8)
+
+
+def is_array(grid) -> bool:
+    numpy = sys.modules.get("numpy")  # if it hasn't been imported, there can't be an array
+    return numpy is not None and isinstance(grid, numpy.ndarray)
+
+
+def _encode(text: str):
+    import numpy
+
+    return numpy.frombuffer(text.encode("latin-1"), dtype=numpy.uint8)
+
+
+def to_lists(grid) -> Grid:
+    """Convert to the ``List[List[str]]`` form the rest of the program uses."""
+    return [[chr(code) if code != EMPTY else "" for code in row] for row in grid.tolist()]
+
+
+def _start_bounds(size: int, length: int, step: int) -> typing.Tuple[int, int]:
+    if step > 0:
+        return 0, size - length + 1
+    if step < 0:
+        return length - 1, size
+    return 0, size
+
+
+def slot_groups(grid, word: str, directions):
+    """Every place ``word`` fits, as ``{(overlap, direction): array of (x, y) starts}``.
+
+    Works one direction at a time: for each letter of the word, the grid is sliced
+    (a view, no copy) so that element (y, x) is the cell that letter would land on
+    for a word starting at (x, y). ANDing "empty or same letter" across the letters
+    gives every feasible start at once.
+    """
+    import numpy
+
+    height, width = grid.shape
+    codes = _encode(word)
+    groups = {}
+    for direction in directions:
+        dx, dy = direction.step
+        x_start, x_end = _start_bounds(width, len(word), dx)
+        y_start, y_end = _start_bounds(height, len(word), dy)
+        if x_start >= x_end or y_start >= y_end:
+            continue
+
+        fits = numpy.ones((y_end - y_start, x_end - x_start), dtype=bool)
+        overlap = numpy.zeros(fits.shape, dtype=numpy.int32)
+        for i, code in enumerate(codes):
+            cells = grid[y_start + i * dy : y_end + i * dy, x_start + i * dx : x_end + i * dx]
+            matches = cells == code
+            fits &= matches | (cells == EMPTY)
+            overlap += matches
+
+        ys, xs = numpy.nonzero(fits)
+        starts = numpy.stack([xs + x_start, ys + y_start], axis=1)
+        overlaps = overlap[ys, xs]
+        for count in numpy.unique(overlaps).tolist():
+            groups[count, direction] = starts[overlaps == count]
+    return groups
+
+
+def write(
+    grid, word: str, x: int, y: int, direction: Direction
+) -> typing.List[typing.Tuple[int, int]]:
+    """Write ``word`` into the grid, returning the cells that were empty before."""
+    dx, dy = direction.step
+    written = []
+    for i, code in enumerate(_encode(word)):
+        cell_x, cell_y = x + i * dx, y + i * dy
+        if grid[cell_y, cell_x] == EMPTY:
+            grid[cell_y, cell_x] = code
+            written.append((cell_x, cell_y))
+    return written
+
+
+def clear(grid, cells: typing.Iterable[typing.Tuple[int, int]]):
+    for x, y in cells:
+        grid[y, x] = EMPTY
+
+
+def random_fill(grid, alphabet: str, rng: random.Random):
+    """Fill every empty cell from ``alphabet`` in one draw (seeded from ``rng``)."""
+    import numpy
+
+    empty = grid == EMPTY
+    generator = numpy.random.default_rng(rng.getrandbits(64))
+    grid[empty] = generator.choice(_encode(alphabet), size=int(empty.sum()))
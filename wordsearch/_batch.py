@@ -0,0 +1,196 @@
+"""Generating many puzzles from a manifest, across a pool of worker processes."""
+
+import csv
+import functools
+import json
+import multiprocessing
+import pathlib
+import random
+import typing
+
+from wordsearch import _cache, _english_words, _generator, _grid, _output, _stats
+
+
+class Job(typing.NamedTuple):
+    """One puzzle to generate."""
+
+    wordlist: pathlib.Path
+    output: pathlib.Path
+    width: typing.Optional[int]
+    height: typing.Optional[int]
+    hardness_level: str
+    seed: int
+
+
+class JobResult(typing.NamedTuple):
+    job: Job
+    error: typing.Optional[str] = None
+    stats: typing.Optional[typing.Dict[str, typing.Any]] = None  # Stats.as_dict, if collected
+    puzzle: typing.Optional[typing.Dict[str, typing.Any]] = (
+        None  # Puzzle.as_dict, if not written to files
+    )
+
+
+def answer_key_path(output: pathlib.Path) -> pathlib.Path:
+    """Where the answer key for a puzzle written to ``output`` goes."""
+    return output.with_name(f"{output.stem}_answer_key{output.suffix}")
+
+
+def _read_rows(file: pathlib.Path) -> typing.List[typing.Dict[str, typing.Any]]:
+    with file.open(newline="") as f:
+        if file.suffix.lower() == ".json":
+            rows = json.load(f)
+            if not isinstance(rows, list):
+                raise ValueError("A JSON manifest must be a list of objects.")
+            return rows
+        return list(csv.DictReader(f))
+
+
+def _positive_int(value: typing.Any, name: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise ValueError(f"{name} must be at least 1, not {number}")
+    return number
+
+
+def _parse_size(
+    row: typing.Dict[str, typing.Any],
+) -> typing.Tuple[typing.Optional[int], typing.Optional[int]]:
+    size = str(row.get("size") or "").lower()
+    if size:
+        width, _, height = size.partition("x")
+        return _positive_int(width, "size"), _positive_int(height or width, "size")
+    width = row.get("width")
+    height = row.get("height")
+    return (
+        _positive_int(width, "width") if width not in (None, "") else None,
+        _positive_int(height, "height") if height not in (None, "") else None,
+    )
+
+
+def _path(row: typing.Dict[str, typing.Any], key: str) -> str:
+    value = row.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{key} is missing")
+    return value
+
+
+def load_manifest(file: pathlib.Path) -> typing.List[Job]:
+    """Read the jobs from a JSON (list of objects) or CSV manifest.
+
+    Each entry needs ``wordlist`` and ``output`` (relative paths are relative to the
+    manifest), and can have ``size`` (``30`` or ``30x20``) or ``width``/``height``,
+    ``hardness`` (default medium) and ``seed`` (picked at random if missing).
+    """
+    jobs = []
+    for number, row in enumerate(_read_rows(file), start=1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("must be an object with wordlist and output")
+            width, height = _parse_size(row)
+            hardness_level = str(row.get("hardness") or "medium").lower()
+            if hardness_level not in _generator.HARDNESS_LEVELS:
+                raise ValueError(f"hardness must be one of {', '.join(_generator.HARDNESS_LEVELS)}")
+            seed = row.get("seed")
+            seed = int(seed) if seed not in (None, "") else random.randint(0, 2**10 - 1)
+            if not _output.MIN_SEED <= seed <= _output.MAX_SEED:
+                raise ValueError(f"seed must fit in 64 bits, not {seed}")
+            jobs.append(
+                Job(
+                    wordlist=file.parent / _path(row, "wordlist"),
+                    output=file.parent / _path(row, "output"),
+                    width=width,
+                    height=height,
+                    hardness_level=hardness_level,
+                    seed=seed,
+                )
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Entry {number} of {file}: {e}") from e
+    return jobs
+
+
+def _run_job(
+    job: Job,
+    fill_mode: str,
+    grid_backend: str,
+    collect_stats: bool,
+    cache: typing.Optional[_cache.ResultCache],
+    write_files: bool,
+) -> JobResult:
+    stats = _stats.Stats() if collect_stats else _stats.NO_STATS
+    try:
+        return _generate(job, fill_mode, grid_backend, stats, cache, write_files)
+    except (OSError, ValueError) as e:
+        return JobResult(job, str(e), stats.as_dict() if collect_stats else None)
+    except Exception as e:  # anything else is a bug, but it shouldn't stop the rest of the batch
+        return JobResult(
+            job, f"{type(e).__name__}: {e}", stats.as_dict() if collect_stats else None
+        )
+
+
+def _generate(
+    job: Job,
+    fill_mode: str,
+    grid_backend: str,
+    stats: _stats.Stats,
+    cache: typing.Optional[_cache.ResultCache],
+    write_files: bool,
+) -> JobResult:
+    words = _generator.clean_words(job.wordlist.read_text().splitlines())
+    if not words:
+        raise ValueError(f"{job.wordlist} has no words in it")
+    puzzle = _generator.generate_puzzle(
+        words,
+        width=job.width,
+        height=job.height,
+        hardness_level=job.hardness_level,
+        seed=job.seed,
+        fill_mode=fill_mode,
+        grid_backend=grid_backend,
+        stats=stats,
+        cache=cache,
+    )
+
+    collected = stats.as_dict() if stats.enabled else None
+    if not write_files:
+        return JobResult(job, stats=collected, puzzle=puzzle.as_dict())
+    job.output.parent.mkdir(parents=True, exist_ok=True)
+    with job.output.open("w") as f:
+        _grid.print_grid(puzzle.grid, file=f)
+    with answer_key_path(job.output).open("w") as f:
+        _grid.print_grid(puzzle.answer_key, file=f)
+    return JobResult(job, stats=collected)
+
+
+def run_batch(
+    jobs: typing.Sequence[Job],
+    processes: typing.Optional[int] = None,
+    fill_mode: str = "constrained",
+    grid_backend: str = "lists",
+    collect_stats: bool = False,
+    cache: typing.Optional[_cache.ResultCache] = None,
+    write_files: bool = True,
+) -> typing.Iterator[JobResult]:
+    """Generate every job across ``processes`` workers, yielding each result as it's written.
+
+    Each job gets its own ``random.Random(seed)``, so its puzzle doesn't depend on
+    which worker ran it or in what order. With ``collect_stats`` each result carries
+    the ``Stats.as_dict`` of its job. Every worker shares ``cache``, if given.
+    Without ``write_files`` nothing is written; each result carries its puzzle
+    instead, for the caller to stream somewhere (see ``_output``).
+    """
+    # load before the pool starts so forked workers share this copy; workers that are
+    # spawned instead (Windows, macOS) load their own, which is quick once compiled
+    _english_words.preload()
+
+    run = functools.partial(
+        _run_job,
+        fill_mode=fill_mode,
+        grid_backend=grid_backend,
+        collect_stats=collect_stats,
+        cache=cache,
+        write_files=write_files,
+    )
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(run, jobs)
@@ -0,0 +1,339 @@
+"""Finding dictionary words in the grid that aren't in the search list ("bonus" words)."""
+
+import math
+import os
+import typing
+
+from wordsearch._compiled_dictionary import CompiledDictionary
+from wordsearch._english_words import Dictionary
+from wordsearch._grid import Direction, Grid
+from wordsearch._stats import NO_STATS, Stats
+
+
+class Hit(typing.NamedTuple):
+    """A bonus word found in the grid, reading from (x, y) in ``direction``."""
+
+    word: str
+    x: int
+    y: int
+    direction: Direction
+
+    def coords(self) -> typing.List[typing.Tuple[int, int]]:
+        dx, dy = self.direction.step
+        return [(self.x + i * dx, self.y + i * dy) for i in range(len(self.word))]
+
+    def sort_key(self):
+        """Order hits the way a cell-by-cell scan of the grid comes across them."""
+        return self.y, self.x, self.direction.value, len(self.word)
+
+
+def allowed_words(words, allow_words=()) -> typing.FrozenSet[str]:
+    """Everything a hit may spell without being a bonus word, uppercase.
+
+    That is the search words, every start of one, and ``allow_words``.
+
+    Built once per puzzle so checking a hit is a single set lookup.
+    """
+    allowed = {word.upper()[:end] for word in words for end in range(1, len(word) + 1)}
+    allowed.update(word.upper() for word in allow_words)
+    return frozenset(allowed)
+
+
+def iter_words_from(
+    grid: Grid, root, x: int, y: int, direction: Direction, stats: Stats = NO_STATS
+):
+    """Yield each dictionary word that reads from (x, y) in ``direction``, shortest first."""
+    dx, dy = direction.step
+    height = len(grid)
+    width = len(grid[0])
+    node = root
+    word = ""
+    try:
+        while 0 <= x < width and 0 <= y < height:
+            char = grid[y][x]
+            node = node.advance(char.lower())
+            if node is None:
+                return
+            word += char
+            if node.is_terminal:
+                yield word
+            x += dx
+            y += dy
+    finally:
+        stats.count("trie_nodes_visited", len(word) + 1)
+
+
+def iter_hits_from(
+    grid: Grid,
+    dictionary: Dictionary,
+    allowed: typing.AbstractSet[str],
+    x: int,
+    y: int,
+    direction: Direction,
+    stats: Stats = NO_STATS,
+):
+    """Yield each bonus word (not in ``allowed``) reading from (x, y) in ``direction``."""
+    for word in iter_words_from(grid, dictionary.root, x, y, direction, stats):
+        if word not in allowed:
+            yield Hit(word, x, y, direction)
+
+
+def iter_hits_through(
+    grid: Grid,
+    dictionary: Dictionary,
+    allowed: typing.AbstractSet[str],
+    x: int,
+    y: int,
+    stats: Stats = NO_STATS,
+):
+    """Yield each bonus word that includes (x, y), in any direction.
+
+    Only looks as far from (x, y) as the longest word in the dictionary, and stops
+    at empty cells since no word can cross one.
+    """
+    height = len(grid)
+    width = len(grid[0])
+    for direction in Direction:
+        dx, dy = direction.step
+        for offset in range(dictionary.max_word_length):
+            start_x = x - offset * dx
+            start_y = y - offset * dy
+            if not (0 <= start_x < width and 0 <= start_y < height) or not grid[start_y][start_x]:
+                break
+            for hit in iter_hits_from(
+                grid, dictionary, allowed, start_x, start_y, direction, stats
+            ):
+                if len(hit.word) > offset:
+                    yield hit
+
+
+def count_hits_by_letter(
+    grid: Grid, dictionary: Dictionary, allowed: typing.AbstractSet[str], x: int, y: int, letters
+) -> typing.Dict[str, int]:
+    """How many bonus words would run through (x, y) with each of ``letters`` there.
+
+    The part of each word before (x, y) doesn't depend on the letter, so it's
+    walked once per start and only the rest is walked per letter. The current
+    letter at (x, y) is ignored.
+    """
+    height = len(grid)
+    width = len(grid[0])
+    counts = dict.fromkeys(letters, 0)
+    for direction in Direction:
+        dx, dy = direction.step
+        for offset in range(dictionary.max_word_length):
+            start_x = x - offset * dx
+            start_y = y - offset * dy
+            if not (0 <= start_x < width and 0 <= start_y < height) or not grid[start_y][start_x]:
+                break
+            node = dictionary.root
+            prefix = ""
+            for i in range(offset):
+                char = grid[start_y + i * dy][start_x + i * dx]
+                node = node.advance(char.lower())
+                if node is None:
+                    break
+                prefix += char
+            if node is None:
+                continue
+
+            for letter in letters:
+                current = node.advance(letter.lower())
+                word = prefix + letter
+                cell_x, cell_y = x + dx, y + dy
+                while current is not None:
+                    if current.is_terminal and word not in allowed:
+                        counts[letter] += 1
+                    if (
+                        not (0 <= cell_x < width and 0 <= cell_y < height)
+                        or not grid[cell_y][cell_x]
+                    ):
+                        break
+                    char = grid[cell_y][cell_x]
+                    current = current.advance(char.lower())
+                    word += char
+                    cell_x += dx
+                    cell_y += dy
+    return counts
+
+
+def line_starts(
+    width: int, height: int, direction: Direction
+) -> typing.List[typing.Tuple[int, int]]:
+    """The first cell of every full line across the grid in ``direction``, in reading order."""
+    dx, dy = direction.step
+    starts = []
+    for y in range(height):
+        if not 0 <= y - dy < height:
+            starts.extend((x, y) for x in range(width))
+        elif dx:
+            starts.append((0 if dx > 0 else width - 1, y))
+    return starts
+
+
+def _steps_left(position: int, size: int, step: int) -> float:
+    if step > 0:
+        return size - position
+    if step < 0:
+        return position + 1
+    return math.inf  # not moving along this side
+
+
+def _scan_lines(
+    grid: Grid,
+    automaton: CompiledDictionary,
+    allowed: typing.AbstractSet[str],
+    direction: Direction,
+    starts,
+) -> typing.List[Hit]:
+    """The bonus words on the lines starting at ``starts``, reading in ``direction``."""
+    dx, dy = direction.step
+    height = len(grid)
+    width = len(grid[0])
+    hits = []
+    for x, y in starts:
+        length = int(min(_steps_left(x, width, dx), _steps_left(y, height, dy)))
+        text = "".join(grid[y + i * dy][x + i * dx] for i in range(length))
+        for start, length in automaton.scan(text.lower()):
+            word = text[start : start + length]
+            if word not in allowed:
+                hits.append(Hit(word, x + start * dx, y + start * dy, direction))
+    return hits
+
+
+def find_all_hits(
+    grid: Grid,
+    automaton: CompiledDictionary,
+    allowed: typing.AbstractSet[str],
+    stats: Stats = NO_STATS,
+    processes: typing.Optional[int] = 1,
+) -> typing.List[Hit]:
+    """Find every bonus word in the grid in one pass over each line (all 8 directions).
+
+    With ``processes`` other than 1 (None for one per CPU), a grid of at least
+    ``PARALLEL_SCAN_MIN_CELLS`` is scanned across that many worker processes.
+    """
+    height = len(grid)
+    width = len(grid[0])
+    if processes != 1 and width * height >= PARALLEL_SCAN_MIN_CELLS and _can_fork():
+        hits = _scan_in_parallel(grid, automaton, allowed, processes or os.cpu_count() or 1)
+    else:
+        hits = [
+            hit
+            for direction in Direction
+            for hit in _scan_lines(
+                grid, automaton, allowed, direction, line_starts(width, height, direction)
+            )
+        ]
+
+    stats.count(
+        "trie_nodes_visited", len(Direction) * width * height
+    )  # the automaton takes one step per letter
+    for hit in hits:
+        stats.count_by("hits", hit.direction.name)
+    return hits
+
+
+# Scanning in parallel: every line is scanned whole by one worker, so (unlike
+# splitting the grid into overlapping bands) no word can be cut at a boundary and
+# no hit is found twice. Workers are forked, so they share the grid and the
+# automaton (which for a compiled dictionary is the same mapped file) without
+# copying them; where fork isn't available the scan just runs in this process.
+PARALLEL_SCAN_MIN_CELLS = 200 * 200
+_SHARDS_PER_PROCESS = 4
+_worker_scan_state: typing.Dict[str, typing.Any] = {}
+
+
+def _can_fork() -> bool:
+    import multiprocessing  # only needed for poster-size grids, so not imported up front
+
+    return (
+        "fork" in multiprocessing.get_all_start_methods()
+        and not multiprocessing.current_process().daemon
+    )
+
+
+def _start_scan_worker(grid: Grid, automaton: CompiledDictionary, allowed: typing.AbstractSet[str]):
+    _worker_scan_state.update(grid=grid, automaton=automaton, allowed=allowed)
+
+
+def _scan_shard(
+    shard: typing.Tuple[Direction, typing.List[typing.Tuple[int, int]]],
+) -> typing.List[Hit]:
+    direction, starts = shard
+    state = _worker_scan_state
+    return _scan_lines(state["grid"], state["automaton"], state["allowed"], direction, starts)
+
+
+def _scan_in_parallel(
+    grid: Grid, automaton: CompiledDictionary, allowed: typing.AbstractSet[str], processes: int
+) -> typing.List[Hit]:
+    shards = []
+    for direction in Direction:
+        starts = line_starts(len(grid[0]), len(grid), direction)
+        size = math.ceil(len(starts) / (processes * _SHARDS_PER_PROCESS))
+        shards.extend((direction, starts[i : i + size]) for i in range(0, len(starts), size))
+
+    import multiprocessing
+
+    context = multiprocessing.get_context("fork")
+    with context.Pool(processes, _start_scan_worker, (grid, automaton, allowed)) as pool:
+        # map keeps the shards in order, so the hits come out as a serial scan would give them
+        return [hit for hits in pool.map(_scan_shard, shards, chunksize=1) for hit in hits]
+
+
+class IncrementalChecker:
+    """Keeps track of every bonus word in a grid as its letters change.
+
+    After the initial scan, ``cell_changed`` only re-reads the lines through the
+    changed cell, and only as far out as the longest word in the dictionary.
+    If the grid is known to have no bonus words except through ``only_through``
+    cells, the initial scan just looks there.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        dictionary: Dictionary,
+        automaton: CompiledDictionary,
+        allowed: typing.AbstractSet[str],
+        stats: Stats = NO_STATS,
+        processes: typing.Optional[int] = 1,
+        only_through: typing.Optional[typing.Iterable[typing.Tuple[int, int]]] = None,
+    ):
+        self._grid = grid
+        self._dictionary = dictionary
+        self._allowed = allowed
+        self._stats = stats
+        self._hits_by_cell: typing.Dict[typing.Tuple[int, int], typing.Set[Hit]] = {}
+        self.hits: typing.Set[Hit] = set()
+
+        if only_through is None:
+            for hit in find_all_hits(grid, automaton, allowed, stats, processes):
+                self._add(hit)
+        else:
+            for x, y in only_through:
+                for hit in iter_hits_through(grid, dictionary, allowed, x, y, stats):
+                    self._add(hit)
+
+    def _add(self, hit: Hit):
+        self.hits.add(hit)
+        for coord in hit.coords():
+            self._hits_by_cell.setdefault(coord, set()).add(hit)
+
+    def _remove(self, hit: Hit):
+        self.hits.discard(hit)
+        for coord in hit.coords():
+            self._hits_by_cell[coord].discard(hit)
+
+    def cell_changed(self, x: int, y: int):
+        """Update the known hits after the letter at (x, y) changed."""
+        for hit in list(self._hits_by_cell.get((x, y), ())):
+            self._remove(hit)
+
+        for hit in iter_hits_through(
+            self._grid, self._dictionary, self._allowed, x, y, self._stats
+        ):
+            if hit not in self.hits:
+                self._stats.count_by("hits", hit.direction.name)
+            self._add(hit)
@@ -0,0 +1,91 @@
+"""An on-disk cache of generated puzzles, so asking for the same puzzle again is instant.
+
+Entries are keyed by a hash of everything that decides what the puzzle looks like
+(see ``key``) and stored as ``Puzzle.as_dict`` JSON, one file per puzzle. Reading an
+entry touches its file, and once the directory grows past its size cap the entries
+read longest ago are deleted first.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import time
+import typing
+
+# bump when a change to generation means the same request no longer gives the same puzzle
+_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIR = (
+    pathlib.Path(os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache") / "wordsearch"
+)
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+def key(**request: typing.Any) -> str:
+    """The cache key for a puzzle request: a hash of its (JSON-able) fields, in any order."""
+    text = json.dumps({"version": _FORMAT_VERSION, **request}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultCache:
+    """Puzzles cached in ``directory``, kept under ``max_bytes`` by dropping the least recent."""
+
+    def __init__(
+        self, directory: pathlib.Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def _touch(path: pathlib.Path):
+        # set explicitly: the file system's own clock can be too coarse to order entries used
+        # close together
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def get(self, key: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """The cached puzzle for ``key``, or None if there isn't one (or it can't be read)."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            self._touch(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, puzzle: typing.Dict[str, typing.Any]):
+        """Store ``puzzle`` under ``key``, then evict old entries if the cache is over its cap."""
+        import tempfile  # only needed on a miss, and slow to import next to a cache hit
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # write then rename, so other processes never read a half-written entry
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.directory, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(puzzle, f)
+        os.replace(f.name, self._path(key))
+        self._touch(self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:  # removed by another process in the meantime
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,224 @@
+"""Flat, memory-mapped form of the word trie, doubling as an Aho-Corasick automaton.
+
+Layout (integers are little-endian; uint32 unless noted)::
+
+    header      magic, source fingerprint, node count, edge count, longest word
+    offsets     node_count + 1 entries; node N's edges are [offsets[N], offsets[N + 1])
+    edge_chars  code point of each edge, sorted within a node
+    edge_nodes  node each edge leads to
+    fail        longest proper suffix of node N's prefix that is also a prefix (0 = root)
+    output      nearest terminal node along N's fail chain (0 = none)
+    depth       uint16; length of the prefix node N spells
+    terminal    uint8; 1 where a word ends
+
+Nodes are numbered breadth first, so node 0 is the root.
+"""
+
+import array
+import bisect
+import mmap
+import pathlib
+import struct
+import sys
+import typing
+
+_MAGIC = b"WSDICT\x00\x02"
+_HEADER = struct.Struct("<8s32sIII")
+_HEADER_SIZE = 64  # padded so the arrays after it stay 4-byte aligned
+_NODE_SECTIONS = (("fail", "I"), ("output", "I"), ("depth", "H"), ("terminal", "B"))
+
+
+class CompiledNode:
+    """A cursor into a compiled dictionary (same interface as ``WordPointer``)."""
+
+    __slots__ = ("_dictionary", "_index", "is_terminal")
+
+    def __init__(self, dictionary: "CompiledDictionary", index: int):
+        self._dictionary = dictionary
+        self._index = index
+        self.is_terminal = bool(dictionary._terminal[index])
+
+    def advance(self, char: str) -> typing.Optional["CompiledNode"]:
+        """Move one (lowercase) character deeper, or None if no word continues that way."""
+        if len(char) != 1:
+            return None
+        index = self._dictionary._goto(self._index, ord(char))
+        if index is None:
+            return None
+        return CompiledNode(self._dictionary, index)
+
+
+class CompiledDictionary:
+    """A read-only trie with Aho-Corasick links, in flat arrays (usually a memory-mapped file)."""
+
+    def __init__(
+        self,
+        sections: typing.Dict[str, typing.Sequence[int]],
+        max_word_length: int,
+        fingerprint=b"",
+    ):
+        self.fingerprint = fingerprint
+        self.max_word_length = max_word_length
+        self._offsets = sections["offsets"]
+        self._edge_chars = sections["edge_chars"]
+        self._edge_nodes = sections["edge_nodes"]
+        self._fail = sections["fail"]
+        self._output = sections["output"]
+        self._depth = sections["depth"]
+        self._terminal = sections["terminal"]
+        self.root = CompiledNode(self, 0)
+
+    @classmethod
+    def from_file(cls, file: pathlib.Path) -> "CompiledDictionary":
+        with file.open("rb") as f:
+            file_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(file_map)
+        magic, fingerprint, node_count, edge_count, max_word_length = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            raise ValueError(f"{file} is not a compiled word list (or is from an older version).")
+        expected_size = _HEADER_SIZE + sum(
+            count * struct.calcsize(type_code)
+            for _, type_code, count in _section_layout(node_count, edge_count)
+        )
+        if len(view) != expected_size:
+            raise ValueError(
+                f"{file} is {len(view)} bytes but its header says {expected_size} (truncated?)."
+            )
+
+        sections = {}
+        start = _HEADER_SIZE
+        for name, type_code, count in _section_layout(node_count, edge_count):
+            end = start + count * struct.calcsize(type_code)
+            sections[name] = view[start:end].cast(type_code)
+            start = end
+        return cls(sections, max_word_length, fingerprint)
+
+    @classmethod
+    def from_trie(cls, root, max_word_length: int) -> "CompiledDictionary":
+        """Flatten a ``WordPointer`` trie in memory."""
+        return cls(_flatten(root), max_word_length)
+
+    def _goto(self, index: int, code: int) -> typing.Optional[int]:
+        low = self._offsets[index]
+        high = self._offsets[index + 1]
+        position = bisect.bisect_left(self._edge_chars, code, low, high)
+        if position < high and self._edge_chars[position] == code:
+            return self._edge_nodes[position]
+        return None
+
+    def scan(self, text: str) -> typing.Iterator[typing.Tuple[int, int]]:
+        """Yield (start, length) of every dictionary word in ``text`` (lowercase), in one pass."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        depth = self._depth
+        terminal = self._terminal
+        state = 0
+        for end, char in enumerate(text):
+            code = ord(char)
+            next_state = goto(state, code)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto(state, code)
+            state = next_state or 0
+
+            match = state if terminal[state] else output[state]
+            while match:
+                yield end - depth[match] + 1, depth[match]
+                match = output[match]
+
+
+def _section_layout(node_count: int, edge_count: int):
+    yield "offsets", "I", node_count + 1
+    yield "edge_chars", "I", edge_count
+    yield "edge_nodes", "I", edge_count
+    for name, type_code in _NODE_SECTIONS:
+        yield name, type_code, node_count
+
+
+def _flatten(root) -> typing.Dict[str, array.array]:
+    """Number the trie's nodes breadth first and lay them out as flat arrays, with links."""
+    nodes = [root]
+    offsets = array.array("I", [0])
+    edge_chars = array.array("I")
+    edge_nodes = array.array("I")
+    depth = array.array("H", [0])
+    terminal = array.array("B")
+    index = 0
+    while index < len(nodes):
+        node = nodes[index]
+        terminal.append(node.is_terminal)
+        for char in sorted(node.next):
+            edge_chars.append(ord(char))
+            edge_nodes.append(len(nodes))
+            nodes.append(node.next[char])
+            depth.append(min(depth[index] + 1, 0xFFFF))
+        offsets.append(len(edge_chars))
+        index += 1
+    del nodes
+
+    sections = {
+        "offsets": offsets,
+        "edge_chars": edge_chars,
+        "edge_nodes": edge_nodes,
+        "fail": array.array("I", bytes(4 * len(terminal))),
+        "output": array.array("I", bytes(4 * len(terminal))),
+        "depth": depth,
+        "terminal": terminal,
+    }
+    _link(CompiledDictionary(sections, 0))
+    return sections
+
+
+def _link(dictionary: CompiledDictionary):
+    """Fill in the fail and output links; breadth-first numbering means parents are done first."""
+    fail = dictionary._fail
+    output = dictionary._output
+    # children of the root (node 0) fail back to the root, which is what the arrays start as
+    for parent in range(1, len(dictionary._terminal)):
+        for edge in range(dictionary._offsets[parent], dictionary._offsets[parent + 1]):
+            child = dictionary._edge_nodes[edge]
+            code = dictionary._edge_chars[edge]
+            state = fail[parent]
+            target = dictionary._goto(state, code)
+            while target is None and state:
+                state = fail[state]
+                target = dictionary._goto(state, code)
+            fail[child] = target or 0
+            output[child] = (
+                fail[child] if dictionary._terminal[fail[child]] else output[fail[child]]
+            )
+
+
+def write(
+    file: pathlib.Path, root, fingerprint: bytes, max_word_length: int
+) -> typing.Tuple[int, int]:
+    """Flatten the trie under ``root`` into ``file``; returns the (node, edge) counts."""
+    sections = _flatten(root)
+    node_count = len(sections["terminal"])
+    edge_count = len(sections["edge_chars"])
+
+    header = _HEADER.pack(_MAGIC, fingerprint, node_count, edge_count, max_word_length)
+    tmp_file = file.with_suffix(file.suffix + ".tmp")
+    with tmp_file.open("wb") as f:
+        f.write(header.ljust(_HEADER_SIZE, b"\x00"))
+        for name, _, _ in _section_layout(node_count, edge_count):
+            section = sections[name]
+            if sys.byteorder != "little":
+                section.byteswap()
+            section.tofile(f)
+    tmp_file.replace(file)
+    return node_count, edge_count
+
+
+def load(file: pathlib.Path, fingerprint: bytes) -> typing.Optional[CompiledDictionary]:
+    """Map ``file`` if it exists and was compiled from word files matching ``fingerprint``."""
+    if sys.byteorder != "little" or not file.is_file():
+        return None
+    try:
+        dictionary = CompiledDictionary.from_file(file)
+    except (ValueError, struct.error):
+        return None
+    if dictionary.fingerprint != fingerprint:
+        return None
+    return dictionary
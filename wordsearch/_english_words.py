@@ -1,86 +1,243 @@
 import functools
+import hashlib
 import pathlib
+import sys
+import typing
 
-import tqdm
-
+from wordsearch import _compiled_dictionary
 
 _MODULE_DIR = pathlib.Path(__file__).parent
 _OFFENSIVE_WORDS_FILE = _MODULE_DIR / "offensive_words.txt"
 _ALL_ENGLISH_WORDS = _MODULE_DIR / "all_english_words.txt"
-CHECK_FOR_OTHER_WORDS = _OFFENSIVE_WORDS_FILE.is_file() or _ALL_ENGLISH_WORDS.is_file()
+COMPILED_WORDS_FILE = _MODULE_DIR / "compiled_words.bin"
 
 ROOT_CHAR = object()
-WORD_END = object()
 
 
 class WordPointer:
-    """A character in a map of words."""
+    """A character in a map of words.
+
+    Also serves as a cursor into the trie: start at the root and call ``advance``
+    once per character, checking ``is_terminal`` to see if a word ends there.
+    """
+
+    __slots__ = ("char", "next", "is_terminal")
 
     def __init__(self, char: str):
-        self._direct_children = set()
         self.char = char
-        self.next = []
+        self.next: typing.Dict[str, "WordPointer"] = {}
+        self.is_terminal = False
 
     def add_child(self, char: str) -> "WordPointer":
-        result = None
-        if char not in self._direct_children:
-            result = WordPointer(char)
-            self._direct_children.add(char)
-            self.next.append(result)
-            return result
-        for child in self.next:
-            if child.char == char:
-                return child
+        child = self.next.get(char)
+        if child is None:
+            child = self.next[char] = WordPointer(char)
+        return child
 
     def word_finished(self):
         """Mark the end of a word."""
-        if WORD_END not in self._direct_children:
-            self._direct_children.add(WORD_END)
+        self.is_terminal = True
 
-    def find_word(self, word: str) -> bool:
-        """Check if a word is in the trie."""
+    def advance(self, char: str) -> typing.Optional["WordPointer"]:
+        """Move one (lowercase) character deeper, or None if no word continues that way."""
+        return self.next.get(char)
+
+    def _walk(self, word: str) -> typing.Optional["WordPointer"]:
         current = self
         for c in word.lower():
-            if c not in current._direct_children:
-                return False
-            current = next(child for child in current.next if child.char == c)
-        return WORD_END in current._direct_children
+            current = current.next.get(c)
+            if current is None:
+                return None
+        return current
+
+    def find_word(self, word: str) -> bool:
+        """Check if a word is in the trie."""
+        end = self._walk(word)
+        return end is not None and end.is_terminal
 
     def find_start_of_word(self, word: str) -> bool:
         """Check if a word is in the trie -> does NOT need to have an ending after it."""
-        current = self
-        for c in word.lower():
-            if c not in current._direct_children:
-                return False
-            current = next(child for child in current.next if child.char == c)
-        return True
+        return self._walk(word) is not None
 
 
 _ROOT = WordPointer(ROOT_CHAR)
 
 
-def _load_words_from_file(file: pathlib.Path, minimum_length=1):
+class Dictionary(typing.NamedTuple):
+    """The loaded bonus words: a cursor at the root of the trie and its longest word."""
+
+    root: typing.Any
+    max_word_length: int
+    automaton: typing.Optional[_compiled_dictionary.CompiledDictionary] = None
+
+
+@functools.lru_cache(maxsize=1)
+def check_for_other_words() -> bool:
+    """Whether there are any word files to check for bonus words (looked for on first use)."""
+    return _OFFENSIVE_WORDS_FILE.is_file() or _ALL_ENGLISH_WORDS.is_file()
+
+
+def __getattr__(name: str):
+    if name == "CHECK_FOR_OTHER_WORDS":  # the constant this used to be
+        return check_for_other_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _source_files() -> typing.List[typing.Tuple[pathlib.Path, int]]:
+    """The word files that exist, with the minimum word length to load from each."""
+    return [
+        (file, minimum_length)
+        for file, minimum_length in ((_ALL_ENGLISH_WORDS, 2), (_OFFENSIVE_WORDS_FILE, 1))
+        if file.is_file()
+    ]
+
+
+def _source_fingerprint() -> bytes:
+    """Hash of the word files' contents, used to tell if a compiled dictionary is stale."""
+    digest = hashlib.sha256()
+    for file, minimum_length in _source_files():
+        digest.update(f"{file.name}:{minimum_length}:".encode())
+        digest.update(file.read_bytes())
+    return digest.digest()
+
+
+@functools.lru_cache(maxsize=1)
+def dictionary_fingerprint() -> str:
+    """Hex hash of the word files, identifying which bonus words a puzzle was checked against."""
+    return _source_fingerprint().hex()
+
+
+def _load_words_from_file(
+    file: pathlib.Path,
+    minimum_length=1,
+    root=_ROOT,
+    maximum_length: typing.Optional[int] = None,
+    alphabet: typing.Optional[typing.AbstractSet[str]] = None,
+) -> int:
+    """Add the words in a file to the trie, returning the length of the longest one.
+
+    Words longer than ``maximum_length`` or with (lowercase) characters outside
+    ``alphabet`` are skipped, if those are given.
+    """
+    longest = 0
     with file.open(encoding="utf-8") as f:
         for line in f:
             word = line.strip()
             if not word or word.startswith("#") or len(word) < minimum_length:
                 continue
-            current = _ROOT
-            for c in word.lower():
+            word = word.lower()
+            if maximum_length is not None and len(word) > maximum_length:
+                continue
+            if alphabet is not None and not alphabet.issuperset(word):
+                continue
+            current = root
+            for c in word:
                 current = current.add_child(c)
             current.word_finished()
+            longest = max(longest, len(word))
+    return longest
+
+
+def compile_dictionary(output: pathlib.Path = COMPILED_WORDS_FILE) -> typing.Tuple[int, int]:
+    """Build the trie from the word files and write it out flat for ``load_in_all_words``."""
+    for file, _ in _source_files():
+        print(f"Loading words from {file.name}...", file=sys.stderr)
+    dictionary = load_words(_source_files())
+    return _compiled_dictionary.write(
+        output, dictionary.root, _source_fingerprint(), dictionary.max_word_length
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_compiled() -> typing.Optional[_compiled_dictionary.CompiledDictionary]:
+    """The compiled dictionary, if there is one and it is up to date with the word files."""
+    compiled = _compiled_dictionary.load(COMPILED_WORDS_FILE, _source_fingerprint())
+    if compiled is None and COMPILED_WORDS_FILE.is_file():
+        print(
+            "Compiled dictionary is out of date with the word files, ignoring it "
+            "(run `wordsearch compile-dictionary` to rebuild it).",
+            file=sys.stderr,
+        )
+    return compiled
 
 
 @functools.lru_cache(maxsize=1)
-def load_in_all_words() -> None:
-    """Load all words from the file into the trie."""
-    if _ALL_ENGLISH_WORDS:
+def load_in_all_words() -> Dictionary:
+    """Load all words, from the compiled dictionary if it is up to date, else into the trie."""
+    compiled = _load_compiled()
+    if compiled is not None:
+        return Dictionary(compiled.root, compiled.max_word_length, compiled)
+
+    longest = 0
+    if _ALL_ENGLISH_WORDS.is_file():
         print(
-            "Loading all words from list of English words, this takes a minute or so..."
+            "Loading all words from list of English words, this takes a minute or so...",
+            file=sys.stderr,
+        )
+        longest = _load_words_from_file(_ALL_ENGLISH_WORDS, minimum_length=2)
+    if _OFFENSIVE_WORDS_FILE.is_file():
+        print("Loading words from list of offensive words...", file=sys.stderr)
+        longest = max(longest, _load_words_from_file(_OFFENSIVE_WORDS_FILE))
+
+    return Dictionary(_ROOT, longest)
+
+
+def load_words(
+    sources: typing.Iterable[typing.Tuple[pathlib.Path, int]],
+    maximum_length: typing.Optional[int] = None,
+    alphabet: typing.Optional[typing.AbstractSet[str]] = None,
+) -> Dictionary:
+    """A separate dictionary from ``(file, minimum_length)`` pairs, e.g. for another word list."""
+    root = WordPointer(ROOT_CHAR)
+    longest = 0
+    for file, minimum_length in sources:
+        longest = max(
+            longest, _load_words_from_file(file, minimum_length, root, maximum_length, alphabet)
         )
-        _load_words_from_file(_ALL_ENGLISH_WORDS, minimum_length=2)
-    if _OFFENSIVE_WORDS_FILE:
-        print("Loading words from list of offensive words...")
-        _load_words_from_file(_OFFENSIVE_WORDS_FILE)
+    return Dictionary(root, longest)
+
+
+def dictionary_for_grid(width: int, height: int, alphabet: str) -> Dictionary:
+    """The words that could show up in a ``width`` x ``height`` grid filled from ``alphabet``.
+
+    Nothing longer than the grid's longest line or using a character the grid
+    can't contain can be a bonus word, so loading from the text files skips those
+    words, which for a classroom-sized grid is most of them. Each size and
+    alphabet is only loaded once. If the full dictionary is compiled or already
+    loaded, that is used as is, since it costs nothing more.
+    """
+    if load_in_all_words.cache_info().currsize or _load_compiled() is not None:
+        return load_in_all_words()
+    return _load_for_grid(max(width, height), "".join(sorted(set(alphabet.lower()))))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_for_grid(maximum_length: int, alphabet: str) -> Dictionary:
+    if _ALL_ENGLISH_WORDS.is_file():
+        print(
+            f"Loading words of up to {maximum_length} letters from list of English words...",
+            file=sys.stderr,
+        )
+    return load_words(_source_files(), maximum_length, frozenset(alphabet))
+
+
+@functools.lru_cache(maxsize=8)
+def automaton_for(dictionary: Dictionary) -> _compiled_dictionary.CompiledDictionary:
+    """The dictionary as an Aho-Corasick automaton (built in memory unless loaded compiled)."""
+    if dictionary.automaton is not None:
+        return dictionary.automaton
+    return _compiled_dictionary.CompiledDictionary.from_trie(
+        dictionary.root, dictionary.max_word_length
+    )
+
+
+def load_automaton() -> _compiled_dictionary.CompiledDictionary:
+    """The loaded words as an Aho-Corasick automaton."""
+    return automaton_for(load_in_all_words())
+
 
-    return _ROOT
+def preload():
+    """Load the dictionary and its automaton now, if there are word files, not on first use."""
+    if check_for_other_words():
+        load_in_all_words()
+        load_automaton()
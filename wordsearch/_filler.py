@@ -0,0 +1,77 @@
+"""Choosing filler letters that don't spell bonus words in the first place."""
+
+import random
+import typing
+
+from wordsearch import _bonus_words
+from wordsearch._english_words import Dictionary
+from wordsearch._grid import Grid
+from wordsearch._stats import NO_STATS, Stats
+
+
+def _completes_a_word(
+    grid: Grid, dictionary: Dictionary, allowed, x: int, y: int, stats: Stats
+) -> bool:
+    return any(_bonus_words.iter_hits_through(grid, dictionary, allowed, x, y, stats))
+
+
+def _candidates(alphabet: str, rng: random.Random) -> typing.List[str]:
+    """The alphabet in a random order (letters repeated in it tend to come first)."""
+    return list(dict.fromkeys(rng.sample(alphabet, len(alphabet))))
+
+
+def constrained_fill(
+    grid: Grid,
+    dictionary: Dictionary,
+    allowed,
+    alphabet: str,
+    rng: random.Random,
+    max_backtracks=None,
+    stats: Stats = NO_STATS,
+) -> int:
+    """Fill the empty cells, each with a letter that doesn't finish a bonus word with its neighbors.
+
+    Cells are filled in reading order. Any word in the finished grid has a last
+    filler letter, and that letter was checked with the rest of the word in place,
+    so a grid filled this way has no bonus words other than ones made entirely of
+    placed letters.
+
+    If a cell has no legal letter, the previous cells are revisited (backtracking)
+    until ``max_backtracks`` (default: the number of empty cells) is used up; after
+    that such cells just get a random letter and are left to the repair loop.
+    Returns the number of cells that had to be filled that way.
+    """
+    empty_cells = [
+        (x, y) for y in range(len(grid)) for x in range(len(grid[0])) if grid[y][x] == ""
+    ]
+    if max_backtracks is None:
+        max_backtracks = len(empty_cells)
+
+    remaining_options: typing.List[typing.List[str]] = []
+    forced = 0
+    index = 0
+    while index < len(empty_cells):
+        x, y = empty_cells[index]
+        if len(remaining_options) == index:
+            remaining_options.append(_candidates(alphabet, rng))
+
+        options = remaining_options[index]
+        while options:
+            grid[y][x] = options.pop(0)
+            if not _completes_a_word(grid, dictionary, allowed, x, y, stats):
+                index += 1
+                break
+        else:
+            grid[y][x] = ""
+            if max_backtracks and index:
+                max_backtracks -= 1
+                stats.count("fill_backtracks")
+                remaining_options.pop()
+                index -= 1
+                continue
+            grid[y][x] = rng.choice(alphabet)
+            forced += 1
+            index += 1
+
+    stats.count("fill_forced_cells", forced)
+    return forced
@@ -0,0 +1,481 @@
+"""The puzzle generation pipeline: place the words, fill in around them, remove bonus words.
+
+Everything here takes its randomness from an explicit ``random.Random`` and reports
+progress through an optional ``log`` callable, so puzzles can be generated side by
+side (in threads, processes or a server) without sharing state.
+"""
+
+import collections
+import random
+import re
+import string
+import typing
+
+from wordsearch import (
+    _array_grid,
+    _bonus_words,
+    _cache,
+    _english_words,
+    _filler,
+    _placement,
+    _sizing,
+)
+from wordsearch._grid import Direction, Grid
+from wordsearch._stats import NO_STATS, Stats
+
+DIRECTION_OPTIONS = {
+    "easy": [Direction.FORWARD],
+    "medium": [
+        Direction.FORWARD,
+        Direction.REVERSE,
+        Direction.DOWN,
+        Direction.RIGHT_DOWN,
+    ],
+    "hard": list(Direction),
+}
+HARDNESS_LEVELS = tuple(DIRECTION_OPTIONS)
+FILL_MODES = ("constrained", "random")
+DEFAULT_REPAIR_ITERATIONS = 10_000
+
+
+class Puzzle(typing.NamedTuple):
+    """A finished word search."""
+
+    grid: Grid
+    answer_key: Grid
+    word_coords: typing.Dict[str, _placement.Placement]
+    seed: int
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """Plain JSON-able form: rows as strings (blank answer-key cells as spaces).
+
+        Directions are given by name.
+        """
+        return {
+            "seed": self.seed,
+            "grid": ["".join(row) for row in self.grid],
+            "answer_key": ["".join(ch or " " for ch in row) for row in self.answer_key],
+            "word_coords": {
+                word: {"x": x, "y": y, "direction": direction.name}
+                for word, (x, y, direction) in self.word_coords.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: typing.Dict[str, typing.Any]) -> "Puzzle":
+        """Read back what ``as_dict`` gives."""
+        return cls(
+            grid=[list(row) for row in data["grid"]],
+            answer_key=[[ch.strip() for ch in row] for row in data["answer_key"]],
+            word_coords={
+                word: (coords["x"], coords["y"], Direction[coords["direction"]])
+                for word, coords in data["word_coords"].items()
+            },
+            seed=data["seed"],
+        )
+
+
+def _no_log(message: str):
+    pass
+
+
+def make_grid(width: int, height: int) -> Grid:
+    """Create a grid of the given width and height."""
+    return [["" for _ in range(width)] for _ in range(height)]
+
+
+def clean_words(words: typing.Iterable[str]) -> typing.Tuple[str, ...]:
+    """Drop blank entries and remove spaces from within words, as that prints funny."""
+    return tuple(word.strip().replace(" ", "") for word in words if word.strip())
+
+
+def _digits_in(words) -> typing.Set[str]:
+    """Digits used in the words, which the filler then uses too so they don't stand out."""
+    return {digit for word in words for digit in re.findall(r"\d", word)}
+
+
+def default_size(words) -> int:
+    """Default width/height of a grid: longest word + 2."""
+    return max(len(word) for word in words) + 2
+
+
+def fill_in_grid(
+    words, hardness_level: str, grid, rng: random.Random, stats: Stats = NO_STATS, occupancy=None
+) -> typing.Dict[str, _placement.Placement]:
+    with stats.timer("placement"):
+        return _placement.place_words(
+            grid, words, DIRECTION_OPTIONS[hardness_level], rng, stats=stats, occupancy=occupancy
+        )
+
+
+def safe_random_fill(
+    words,
+    grid,
+    coords,
+    rng: random.Random,
+    numbers_to_include=(),
+    fill_mode="constrained",
+    log=_no_log,
+    dictionary=None,
+    stats: Stats = NO_STATS,
+    allow_words=(),
+    scan_processes=1,
+    occupancy=None,
+    only_through=None,
+) -> typing.Tuple[Grid, Grid]:
+    """Fill the grid with random letters, avoiding the words already placed.
+
+    Bonus words come from ``dictionary``, or the built-in word files if there are any;
+    ``allow_words`` are ones that are fine to leave in. ``scan_processes`` is passed
+    on to ``_bonus_words.find_all_hits`` for the scan before repairing. Pass the
+    ``_placement.Occupancy`` placement filled in to save working it out from ``coords``.
+    If the grid only has letters that were already checked, ``only_through`` can
+    list the cells that changed (including any left empty) so only the lines
+    through them are checked (see ``regenerate_puzzle``).
+    Returns the filled grid (the same list of lists passed in, or a new one if
+    ``grid`` was array-backed) and the answer key.
+    """
+    height = len(grid)
+    width = len(grid[0])
+    if occupancy is None:
+        occupancy = _placement.Occupancy.from_placements(width, height, coords)
+
+    # Fill in the rest of the grid with random letters
+    alphabet = _fill_alphabet(numbers_to_include)
+    check_for_other_words = dictionary is not None or _english_words.check_for_other_words()
+    constrained = check_for_other_words and fill_mode == "constrained"
+    if _array_grid.is_array(grid):
+        if not constrained:
+            _array_grid.random_fill(grid, alphabet, rng)
+        grid = _array_grid.to_lists(grid)
+
+    if check_for_other_words:
+        with stats.timer("dictionary_load"):
+            # the search words can add characters the filler never uses (and the words they spell)
+            dictionary = dictionary or _english_words.dictionary_for_grid(
+                width, height, alphabet + "".join(words)
+            )
+            _english_words.automaton_for(dictionary)
+
+    allowed = _bonus_words.allowed_words(words, allow_words)
+    with stats.timer("fill"):
+        if constrained:
+            _filler.constrained_fill(grid, dictionary, allowed, alphabet, rng, stats=stats)
+        else:
+            for y in range(height):
+                for x in range(width):
+                    if grid[y][x] == "":
+                        grid[y][x] = rng.choice(alphabet)
+
+    if check_for_other_words:
+        with stats.timer("repair"):
+            repair_other_words(
+                grid,
+                allowed,
+                occupancy,
+                alphabet,
+                rng,
+                log,
+                dictionary,
+                stats,
+                scan_processes=scan_processes,
+                only_through=only_through,
+            )
+
+    # filling only touches empty cells and repair only unplaced ones, but make sure
+    for word, (x, y, direction) in coords.items():
+        dx, dy = direction.step
+        for i, c in enumerate(word.upper()):
+            if grid[y + i * dy][x + i * dx] != c:
+                cell_x, cell_y = x + i * dx, y + i * dy
+                raise ValueError(
+                    "Ah!!! We changed a letter in the answer key! -> "
+                    f"({cell_x}, {cell_y}) {c} -> {grid[cell_y][cell_x]}"
+                )
+
+    return grid, occupancy.answer_key(grid)
+
+
+def _fill_alphabet(numbers_to_include) -> str:
+    return string.ascii_uppercase + string.ascii_uppercase + "".join(sorted(numbers_to_include))
+
+
+def preload_dictionary(words, width: int, height: int):
+    """Load the dictionary a ``width`` x ``height`` puzzle of ``words`` checks against, now.
+
+    For loading once before forking workers that all generate that puzzle, so they
+    share it; like ``_english_words.dictionary_for_grid``, that's the whole
+    dictionary only if it is compiled.
+    """
+    if _english_words.check_for_other_words():
+        alphabet = _fill_alphabet(_digits_in(words)) + "".join(words)
+        _english_words.automaton_for(_english_words.dictionary_for_grid(width, height, alphabet))
+
+
+def _describe(hits) -> str:
+    return ", ".join(
+        f"{hit.word} at ({hit.x}, {hit.y}) {hit.direction.name}"
+        for hit in sorted(hits, key=_bonus_words.Hit.sort_key)
+    )
+
+
+def _describe_unfixable(hits, occupancy: _placement.Occupancy) -> str:
+    """Like ``_describe``, also naming the search words each one's letters belong to."""
+    described = []
+    for hit in sorted(hits, key=_bonus_words.Hit.sort_key):
+        words = dict.fromkeys(word for x, y in hit.coords() for word in occupancy.words_at(x, y))
+        described.append(
+            f"{hit.word} at ({hit.x}, {hit.y}) {hit.direction.name} (from {', '.join(words)})"
+        )
+    return ", ".join(described)
+
+
+def repair_other_words(
+    grid,
+    allowed,
+    occupancy: _placement.Occupancy,
+    alphabet,
+    rng: random.Random,
+    log=_no_log,
+    dictionary=None,
+    stats: Stats = NO_STATS,
+    max_iterations=DEFAULT_REPAIR_ITERATIONS,
+    scan_processes=1,
+    only_through=None,
+):
+    """Swap out filler letters until the only words left are ``allowed`` (or can't be changed).
+
+    Min-conflicts: each step picks the filler cell the most bonus words run
+    through (the first in reading order on ties) and gives it the letter that
+    leaves the fewest bonus words through it (ties picked by ``rng``), so one
+    change often fixes several words without making new ones. Words made only
+    of placed letters can't be fixed and are left (and logged). Raises a
+    ``ValueError`` naming the words left if ``max_iterations`` runs out.
+    ``only_through`` limits the first scan to words through those cells (see
+    ``_bonus_words.IncrementalChecker``).
+    """
+    dictionary = dictionary or _english_words.load_in_all_words()
+    checker = _bonus_words.IncrementalChecker(
+        grid,
+        dictionary,
+        _english_words.automaton_for(dictionary),
+        allowed,
+        stats,
+        scan_processes,
+        only_through,
+    )
+    letters = sorted(set(alphabet))
+    unfixable = set()
+    for _ in range(max_iterations):
+        conflicts = collections.Counter()
+        for hit in checker.hits - unfixable:
+            cells = [(x, y) for x, y in hit.coords() if not occupancy.is_placed(x, y)]
+            if not cells:
+                unfixable.add(hit)
+            conflicts.update(cells)
+        if not conflicts:
+            if unfixable:
+                log(
+                    "Left bonus words made only of search-word letters: "
+                    + _describe_unfixable(unfixable, occupancy)
+                )
+            return
+
+        stats.count("repair_iterations")
+        most = max(conflicts.values())
+        x, y = min(
+            (cell for cell, count in conflicts.items() if count == most),
+            key=lambda cell: (cell[1], cell[0]),
+        )
+        current = grid[y][x]
+        scores = _bonus_words.count_hits_by_letter(
+            grid, dictionary, allowed, x, y, [letter for letter in letters if letter != current]
+        )
+        best = min(scores.values())
+        letter = rng.choice([letter for letter, score in scores.items() if score == best])
+
+        log(f"({x}, {y}) {current} -> {letter}: {most} bonus word(s) through it, {best} after")
+        grid[y][x] = letter
+        stats.count("cells_changed")
+        checker.cell_changed(x, y)
+
+    raise ValueError(
+        f"Could not remove every bonus word in {max_iterations} repair iterations; left: "
+        f"{_describe(checker.hits)}"
+    )
+
+
+def generate_puzzle(
+    words: typing.Sequence[str],
+    width: typing.Optional[int] = None,
+    height: typing.Optional[int] = None,
+    hardness_level: str = "medium",
+    seed: typing.Optional[int] = None,
+    fill_mode: str = "constrained",
+    grid_backend: str = "lists",
+    log: typing.Callable[[str], None] = _no_log,
+    dictionary: typing.Optional[_english_words.Dictionary] = None,
+    stats: Stats = NO_STATS,
+    auto_size: bool = False,
+    target_density: typing.Optional[float] = None,
+    allow_words: typing.Iterable[str] = (),
+    scan_processes: typing.Optional[int] = 1,
+    cache: typing.Optional[_cache.ResultCache] = None,
+) -> Puzzle:
+    """Generate one word search from already-cleaned words (see ``clean_words``).
+
+    Bonus words in ``allow_words`` are left alone. With ``auto_size`` the grid is
+    as small as the words fit in (see ``_sizing.find_size``), keeping ``width`` or
+    ``height`` if one is given. Pass a ``Stats`` to find out where the time went.
+    With a ``cache``, a puzzle generated before from the same request (and the same
+    built-in word files) is read back instead of generated again.
+    """
+    if seed is None:
+        seed = random.randint(0, 2**10 - 1)
+    if not auto_size:
+        height = height or default_size(words)
+        width = width or default_size(words)
+    allow_words = tuple(allow_words)
+
+    cache_key = None
+    if cache is not None and dictionary is None:  # a passed-in dictionary can't be fingerprinted
+        with stats.timer("cache"):
+            cache_key = _cache.key(
+                words=list(words),
+                width=width,
+                height=height,
+                hardness=hardness_level,
+                seed=seed,
+                fill_mode=fill_mode,
+                grid_backend=grid_backend,
+                auto_size=auto_size,
+                target_density=target_density,
+                allow_words=sorted(set(allow_words)),
+                dictionary=_english_words.dictionary_fingerprint(),
+            )
+            cached = cache.get(cache_key)
+        if cached is not None:
+            stats.count("cache_hits")
+            return Puzzle.from_dict(cached)
+
+    rng = random.Random(seed)
+
+    grid_factory = _array_grid.make_grid if grid_backend == "numpy" else make_grid
+    occupancy = None
+    if auto_size:
+        if width and height:
+            raise ValueError("Auto-sizing needs at least one of width and height left open.")
+        with stats.timer("auto_size"):
+            sized = _sizing.find_size(
+                words,
+                DIRECTION_OPTIONS[hardness_level],
+                rng,
+                grid_factory,
+                width,
+                height,
+                target_density,
+                stats,
+            )
+        grid, word_coords = sized.grid, sized.placements
+    else:
+        grid = grid_factory(width, height)
+        occupancy = _placement.Occupancy(width, height)
+        word_coords = fill_in_grid(words, hardness_level, grid, rng, stats, occupancy)
+    grid, answer_key = safe_random_fill(
+        words,
+        grid,
+        word_coords,
+        rng,
+        numbers_to_include=_digits_in(words),
+        fill_mode=fill_mode,
+        log=log,
+        dictionary=dictionary,
+        stats=stats,
+        allow_words=allow_words,
+        scan_processes=scan_processes,
+        occupancy=occupancy,
+    )
+    puzzle = Puzzle(grid, answer_key, word_coords, seed)
+    if cache_key is not None:
+        cache.put(cache_key, puzzle.as_dict())
+    return puzzle
+
+
+def regenerate_puzzle(
+    previous: Puzzle,
+    words: typing.Sequence[str],
+    hardness_level: str = "medium",
+    seed: typing.Optional[int] = None,
+    fill_mode: str = "constrained",
+    log: typing.Callable[[str], None] = _no_log,
+    dictionary: typing.Optional[_english_words.Dictionary] = None,
+    stats: Stats = NO_STATS,
+    allow_words: typing.Iterable[str] = (),
+    previous_allow_words: typing.Optional[typing.Iterable[str]] = None,
+) -> Puzzle:
+    """Update ``previous`` for a changed word list, leaving alone what the change doesn't touch.
+
+    Words still in the list keep their places and every filler letter that isn't
+    freed up stays put. Only the new words are placed (around the kept ones, on
+    the same size grid), only the cells freed by removed words are filled again,
+    and only the lines through changed cells are checked for bonus words.
+    ``seed`` defaults to the previous puzzle's.
+
+    Filler anywhere may spell something that was only allowed because of a removed
+    word (or one of ``previous_allow_words``, the ``allow_words`` ``previous`` was
+    made with), so if anything is no longer allowed, or ``previous_allow_words``
+    isn't known, the whole grid is checked instead.
+    """
+    if seed is None:
+        seed = previous.seed
+    rng = random.Random(seed)
+    height = len(previous.grid)
+    width = len(previous.grid[0])
+
+    kept = {word: placement for word, placement in previous.word_coords.items() if word in words}
+    removed = [word for word in previous.word_coords if word not in kept]
+    added = [word for word in dict.fromkeys(words) if word not in kept]
+
+    layout = make_grid(width, height)  # just the kept words, to place the new ones around
+    for word, (x, y, direction) in kept.items():
+        _placement.write(layout, word.upper(), x, y, direction)
+    added_coords = fill_in_grid(added, hardness_level, layout, rng, stats) if added else {}
+    word_coords = {word: kept.get(word) or added_coords[word] for word in dict.fromkeys(words)}
+    occupancy = _placement.Occupancy.from_placements(width, height, word_coords)
+
+    grid = [row[:] for row in previous.grid]
+    changed = set()
+    for word in removed:
+        changed.update(_placement.cells(word, *previous.word_coords[word]))
+    for x, y in changed:
+        if not occupancy.is_placed(x, y):
+            grid[y][x] = ""
+    for word, (x, y, direction) in added_coords.items():
+        for (cell_x, cell_y), c in zip(_placement.cells(word, x, y, direction), word.upper()):
+            if grid[cell_y][cell_x] != c:
+                grid[cell_y][cell_x] = c
+                changed.add((cell_x, cell_y))
+    log(f"Removed {len(removed)} word(s), added {len(added)}, {len(changed)} cell(s) changed")
+
+    allow_words = tuple(allow_words)
+    only_through = changed
+    if previous_allow_words is None or _bonus_words.allowed_words(
+        previous.word_coords, previous_allow_words
+    ) - _bonus_words.allowed_words(words, allow_words):
+        only_through = None
+
+    grid, answer_key = safe_random_fill(
+        words,
+        grid,
+        word_coords,
+        rng,
+        numbers_to_include=_digits_in(words),
+        fill_mode=fill_mode,
+        log=log,
+        dictionary=dictionary,
+        stats=stats,
+        allow_words=allow_words,
+        occupancy=occupancy,
+        only_through=only_through,
+    )
+    return Puzzle(grid, answer_key, word_coords, seed)
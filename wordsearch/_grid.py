@@ -0,0 +1,74 @@
+import enum
+import re
+import typing
+
+Grid = typing.List[typing.List[str]]
+
+
+class Direction(enum.Enum):
+    """Direction of word placement."""
+
+    FORWARD = 0
+    REVERSE = enum.auto()
+    DOWN = enum.auto()
+    UP = enum.auto()
+    RIGHT_DOWN = enum.auto()
+    RIGHT_UP = enum.auto()
+    LEFT_DOWN = enum.auto()
+    LEFT_UP = enum.auto()
+
+    @property
+    def step(self) -> typing.Tuple[int, int]:
+        """The (x, y) offset to the next letter in this direction."""
+        return _DIRECTION_STEPS[self]
+
+
+_DIRECTION_STEPS = {
+    Direction.FORWARD: (1, 0),
+    Direction.REVERSE: (-1, 0),
+    Direction.DOWN: (0, 1),
+    Direction.UP: (0, -1),
+    Direction.RIGHT_DOWN: (1, 1),
+    Direction.RIGHT_UP: (1, -1),
+    Direction.LEFT_DOWN: (-1, 1),
+    Direction.LEFT_UP: (-1, -1),
+}
+
+
+def print_grid(grid: Grid, file=None):
+    """Print the grid to the console."""
+    print(" " * 3, end=" ", file=file)
+    for i in range(len(grid[0])):
+        print(chr(ord("A") + i), end=" ", file=file)
+    print("", file=file)
+
+    for i, row in enumerate(grid):
+        print(f"{i+1:> 3}", " ".join([ch or " " for ch in row]), file=file)
+
+
+_PRINTED_ROW = re.compile(r"^ *\d+ ")
+
+
+def read_grid(text: str) -> Grid:
+    """Parse a grid written by ``print_grid``, or a plain block of letters (space separated or not).
+
+    Blank cells (as in an answer key) come back as ``""``.
+    """
+    lines = [line.rstrip("\r\n") for line in text.splitlines() if line.strip()]
+    if (
+        lines
+        and all(_PRINTED_ROW.match(line) for line in lines[1:])
+        and lines[0].split()[:1] == ["A"]
+    ):
+        # column letters, then "  1 A B C": the cells are every other character after the row number
+        rows = [list(line[_PRINTED_ROW.match(line).end() :: 2]) for line in lines[1:]]
+        width = len(lines[0].split())
+        rows = [[ch.strip() for ch in row] + [""] * (width - len(row)) for row in rows]
+    elif all(len(token) == 1 for line in lines for token in line.split()):
+        rows = [line.split() for line in lines]
+    else:
+        rows = [list(line.strip()) for line in lines]
+
+    if not rows or any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("Not a grid: the rows aren't all the same length.")
+    return rows
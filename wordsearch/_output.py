@@ -0,0 +1,176 @@
+"""Machine-readable puzzle output, written one puzzle at a time so any number can go to one file.
+
+Both formats take puzzles in ``Puzzle.as_dict`` form, optionally with a ``name``
+(batch uses the entry's output path):
+
+``jsonl``
+    One JSON object per line.
+``archive``
+    A compact binary file: an 8-byte magic, then one record per puzzle, each a
+    uint32 length followed by that many bytes of zlib-compressed::
+
+        width, height (uint16), seed (int64), word count (uint16)
+        name        uint16 length + UTF-8
+        grid        uint32 length + UTF-8 of the rows joined together
+        answer key  one bit per cell, row by row, set where a search word's letter is
+        words       per word: uint16 length + UTF-8, then x, y (uint16) and direction (uint8)
+
+    Integers are little-endian. ``read_archive`` turns it back into the same dicts.
+"""
+
+import contextlib
+import json
+import pathlib
+import struct
+import sys
+import typing
+import zlib
+
+from wordsearch._grid import Direction
+
+FORMATS = ("text", "jsonl", "archive")
+
+_MAGIC = b"WSARCH\x00\x01"
+_LENGTH = struct.Struct("<I")
+_SHORT_LENGTH = struct.Struct("<H")
+_PUZZLE = struct.Struct("<HHqH")
+_PLACEMENT = struct.Struct("<HHB")
+
+# an archive stores the seed as an int64
+MIN_SEED = -(2**63)
+MAX_SEED = 2**63 - 1
+
+Record = typing.Dict[str, typing.Any]
+
+
+class JsonLinesWriter:
+    def __init__(self, file: typing.BinaryIO):
+        self._file = file
+
+    def write(self, record: Record):
+        self._file.write(json.dumps(record).encode() + b"\n")
+        self._file.flush()  # so whatever reads the other end sees each puzzle as it's done
+
+
+class ArchiveWriter:
+    def __init__(self, file: typing.BinaryIO):
+        self._file = file
+        self._file.write(_MAGIC)
+
+    def write(self, record: Record):
+        payload = zlib.compress(_pack(record))
+        self._file.write(_LENGTH.pack(len(payload)) + payload)
+        self._file.flush()
+
+
+_WRITERS = {"jsonl": JsonLinesWriter, "archive": ArchiveWriter}
+
+
+@contextlib.contextmanager
+def open_writer(
+    path: pathlib.Path, output_format: str
+) -> typing.Iterator[typing.Union[JsonLinesWriter, ArchiveWriter]]:
+    """A writer for ``output_format`` (jsonl or archive) into ``path``, or stdout for ``-``."""
+    if str(path) == "-":
+        yield _WRITERS[output_format](sys.stdout.buffer)
+        return
+    with path.open("wb") as f:
+        yield _WRITERS[output_format](f)
+
+
+def _pack_text(text: str, length: struct.Struct = _SHORT_LENGTH) -> bytes:
+    encoded = text.encode()
+    return length.pack(len(encoded)) + encoded
+
+
+def _pack(record: Record) -> bytes:
+    if not MIN_SEED <= record["seed"] <= MAX_SEED:
+        raise ValueError(f"Seed {record['seed']} is too big to store in an archive.")
+    grid = record["grid"]
+    height = len(grid)
+    width = len(grid[0]) if grid else 0
+    parts = [
+        _PUZZLE.pack(width, height, record["seed"], len(record["word_coords"])),
+        _pack_text(record.get("name", "")),
+        _pack_text("".join(grid), _LENGTH),
+    ]
+
+    mask = bytearray((width * height + 7) // 8)
+    for y, row in enumerate(record["answer_key"]):
+        for x, ch in enumerate(row):
+            if ch != " ":
+                mask[(y * width + x) // 8] |= 1 << ((y * width + x) % 8)
+    parts.append(bytes(mask))
+
+    for word, placement in record["word_coords"].items():
+        parts.append(_pack_text(word))
+        parts.append(
+            _PLACEMENT.pack(placement["x"], placement["y"], Direction[placement["direction"]].value)
+        )
+    return b"".join(parts)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    def unpack(self, layout: struct.Struct) -> typing.Tuple[int, ...]:
+        values = layout.unpack_from(self._data, self._offset)
+        self._offset += layout.size
+        return values
+
+    def take(self, size: int) -> bytes:
+        if self._offset + size > len(self._data):
+            raise ValueError("Archive record is truncated.")
+        chunk = self._data[self._offset : self._offset + size]
+        self._offset += size
+        return chunk
+
+    def text(self, length: struct.Struct = _SHORT_LENGTH) -> str:
+        (size,) = self.unpack(length)
+        return self.take(size).decode()
+
+
+def _unpack(payload: bytes) -> Record:
+    reader = _Reader(payload)
+    width, height, seed, word_count = reader.unpack(_PUZZLE)
+    name = reader.text()
+    cells = reader.text(_LENGTH)
+    mask = reader.take((width * height + 7) // 8)
+
+    grid = [cells[y * width : (y + 1) * width] for y in range(height)]
+    answer_key = [
+        "".join(
+            ch if mask[(y * width + x) // 8] >> ((y * width + x) % 8) & 1 else " "
+            for x, ch in enumerate(row)
+        )
+        for y, row in enumerate(grid)
+    ]
+    word_coords = {}
+    for _ in range(word_count):
+        word = reader.text()
+        x, y, direction = reader.unpack(_PLACEMENT)
+        word_coords[word] = {"x": x, "y": y, "direction": Direction(direction).name}
+
+    record = {"name": name} if name else {}
+    record.update(seed=seed, grid=grid, answer_key=answer_key, word_coords=word_coords)
+    return record
+
+
+def read_archive(file: typing.BinaryIO) -> typing.Iterator[Record]:
+    """Yield each puzzle in an archive as it's read, in the same form it was written."""
+    if file.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("Not a word search archive (or from a newer version).")
+    while header := file.read(_LENGTH.size):
+        if len(header) < _LENGTH.size:
+            raise ValueError("Archive is truncated.")
+        (size,) = _LENGTH.unpack(header)
+        payload = file.read(size)
+        if len(payload) < size:
+            raise ValueError("Archive is truncated.")
+        try:
+            record = _unpack(zlib.decompress(payload))
+        except (zlib.error, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Archive record is corrupt: {e}") from e
+        yield record
@@ -0,0 +1,229 @@
+"""Placing the search words in the grid."""
+
+import random
+import typing
+
+from wordsearch import _array_grid
+from wordsearch._grid import Direction, Grid
+from wordsearch._stats import NO_STATS, Stats
+
+Placement = typing.Tuple[int, int, Direction]
+
+DEFAULT_NODE_BUDGET = 20_000
+_MAX_CANDIDATES_PER_WORD = 100
+
+
+class SlotIndex:
+    """Every in-bounds start for a word of a given length and direction, computed once each."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._starts: typing.Dict[
+            typing.Tuple[int, Direction], typing.List[typing.Tuple[int, int]]
+        ] = {}
+
+    def starts(self, length: int, direction: Direction) -> typing.List[typing.Tuple[int, int]]:
+        key = (length, direction)
+        if key not in self._starts:
+            dx, dy = direction.step
+            xs = _start_range(self.width, length, dx)
+            ys = _start_range(self.height, length, dy)
+            self._starts[key] = [(x, y) for y in ys for x in xs]
+        return self._starts[key]
+
+
+def cells(word: str, x: int, y: int, direction: Direction) -> typing.List[typing.Tuple[int, int]]:
+    """The cells ``word`` covers when placed at (x, y) in ``direction``."""
+    dx, dy = direction.step
+    return [(x + i * dx, y + i * dy) for i in range(len(word))]
+
+
+def write(
+    grid: Grid, word: str, x: int, y: int, direction: Direction
+) -> typing.List[typing.Tuple[int, int]]:
+    """Write ``word`` into the grid, returning the cells that were empty before."""
+    if _array_grid.is_array(grid):
+        return _array_grid.write(grid, word, x, y, direction)
+    dx, dy = direction.step
+    written = []
+    for i, c in enumerate(word):
+        cell_x, cell_y = x + i * dx, y + i * dy
+        if grid[cell_y][cell_x] == "":
+            grid[cell_y][cell_x] = c
+            written.append((cell_x, cell_y))
+    return written
+
+
+class Occupancy:
+    """Which cells hold search-word letters, and which words run through each one.
+
+    Filled in by placement and read by the fill, repair and answer-key stages, so
+    none of them have to work it out again from the placements.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._placed = bytearray(width * height)
+        self._words_at: typing.Dict[int, typing.List[str]] = {}
+
+    @classmethod
+    def from_placements(
+        cls, width: int, height: int, placements: typing.Dict[str, Placement]
+    ) -> "Occupancy":
+        occupancy = cls(width, height)
+        for word, (x, y, direction) in placements.items():
+            occupancy.add(word, x, y, direction)
+        return occupancy
+
+    def add(self, word: str, x: int, y: int, direction: Direction):
+        for cell_x, cell_y in cells(word, x, y, direction):
+            index = cell_y * self.width + cell_x
+            self._placed[index] = 1
+            self._words_at.setdefault(index, []).append(word)
+
+    def is_placed(self, x: int, y: int) -> bool:
+        return self._placed[y * self.width + x] == 1
+
+    def words_at(self, x: int, y: int) -> typing.List[str]:
+        """The search words that use the letter at (x, y)."""
+        return self._words_at.get(y * self.width + x, [])
+
+    def answer_key(self, grid: Grid) -> Grid:
+        """``grid`` with everything but the search words blanked out."""
+        placed = self._placed
+        width = self.width
+        return [
+            [ch if placed[y * width + x] else "" for x, ch in enumerate(row)]
+            for y, row in enumerate(grid)
+        ]
+
+
+def _start_range(size: int, length: int, step: int) -> range:
+    if step > 0:
+        return range(0, size - length + 1)
+    if step < 0:
+        return range(length - 1, size)
+    return range(0, size)
+
+
+def _overlap(grid: Grid, word: str, x: int, y: int, direction: Direction) -> typing.Optional[int]:
+    """How many letters of ``word`` would land on matching letters (None if it doesn't fit)."""
+    dx, dy = direction.step
+    overlap = 0
+    for i, c in enumerate(word):
+        current_char = grid[y + i * dy][x + i * dx]
+        if current_char == c:
+            overlap += 1
+        elif current_char != "":
+            return None
+    return overlap
+
+
+def legal_slots(grid: Grid, word: str, directions, slots: SlotIndex):
+    """Yield (x, y, direction, overlap) for every place ``word`` fits in the grid as it is now."""
+    for direction in directions:
+        for x, y in slots.starts(len(word), direction):
+            overlap = _overlap(grid, word, x, y, direction)
+            if overlap is not None:
+                yield x, y, direction, overlap
+
+
+def slot_groups(grid: Grid, word: str, directions, slots: SlotIndex):
+    """Every place ``word`` fits, as ``{(overlap, direction): [(x, y), ...]}`` in reading order."""
+    if _array_grid.is_array(grid):
+        return _array_grid.slot_groups(grid, word, directions)
+    groups = {}
+    for x, y, direction, overlap in legal_slots(grid, word, directions, slots):
+        groups.setdefault((overlap, direction), []).append((x, y))
+    return groups
+
+
+def _clear(grid: Grid, cells: typing.List[typing.Tuple[int, int]]):
+    if _array_grid.is_array(grid):
+        _array_grid.clear(grid, cells)
+        return
+    for x, y in cells:
+        grid[y][x] = ""
+
+
+def place_words(
+    grid: Grid,
+    words,
+    directions,
+    rng: random.Random,
+    node_budget=DEFAULT_NODE_BUDGET,
+    stats: Stats = NO_STATS,
+    occupancy: typing.Optional[Occupancy] = None,
+) -> typing.Dict[str, Placement]:
+    """Place every word, backtracking when one doesn't fit.
+
+    Words with the fewest possible slots (in practice the longest ones) go first.
+    Each word's slots are tried overlapping-existing-letters first, then in a random
+    direction order picked per word, then randomly, all from ``rng`` so a seed
+    always gives the same layout. Only the first
+    ``_MAX_CANDIDATES_PER_WORD`` slots in that order are kept for backtracking.
+    ``node_budget`` caps how many placements are tried before giving up with a
+    ``ValueError``. The final placements are recorded in ``occupancy``, if given.
+    """
+    slots = SlotIndex(len(grid[0]), len(grid))
+    input_order = list(dict.fromkeys(words))
+    words = list(input_order)
+    slot_counts = {}
+    for word in words:
+        slot_counts[word] = sum(len(slots.starts(len(word), direction)) for direction in directions)
+        if not slot_counts[word]:
+            raise ValueError(f"Word is too long for grid. Word: {word}")
+    tie_breaks = {word: rng.random() for word in words}
+    words.sort(key=lambda word: (slot_counts[word], tie_breaks[word]))
+
+    placements: typing.Dict[str, Placement] = {}
+    nodes_left = node_budget
+    deepest = 0
+
+    def _candidates(word: str):
+        direction_rank = {
+            direction: rank
+            for rank, direction in enumerate(rng.sample(directions, len(directions)))
+        }
+        groups = slot_groups(grid, word.upper(), directions, slots)
+        candidates = []
+        for overlap, direction in sorted(groups, key=lambda key: (-key[0], direction_rank[key[1]])):
+            starts = groups[overlap, direction]
+            room = _MAX_CANDIDATES_PER_WORD - len(candidates)
+            for i in rng.sample(range(len(starts)), min(room, len(starts))):
+                x, y = starts[i]
+                candidates.append((int(x), int(y), direction))
+            if len(candidates) >= _MAX_CANDIDATES_PER_WORD:
+                break
+        return candidates
+
+    def _place_from(index: int) -> bool:
+        nonlocal nodes_left, deepest
+        if index == len(words):
+            return True
+        deepest = max(deepest, index)
+        word = words[index]
+        for x, y, direction in _candidates(word):
+            if nodes_left <= 0:
+                return False
+            nodes_left -= 1
+            stats.count_by("placement_attempts", word)
+            written = write(grid, word.upper(), x, y, direction)
+            placements[word] = x, y, direction
+            if _place_from(index + 1):
+                return True
+            del placements[word]
+            _clear(grid, written)
+            stats.count("placement_backtracks")
+        return False
+
+    if not _place_from(0):
+        reason = f"gave up after {node_budget} tries" if nodes_left <= 0 else "no arrangement fits"
+        raise ValueError(f"Could not place word in grid ({reason}) ☹. Word: {words[deepest]}")
+    placements = {word: placements[word] for word in input_order}
+    if occupancy is not None:
+        for word, (x, y, direction) in placements.items():
+            occupancy.add(word, x, y, direction)
+    return placements
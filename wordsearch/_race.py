@@ -0,0 +1,97 @@
+"""Racing several seeds for one puzzle, keeping whichever finishes cleanly first.
+
+How long a puzzle takes depends a lot on the seed: most finish quickly, but some
+back off and retry placing words many times, or repair letter after letter. Racing
+a few seeds at once in separate processes cuts off that slow tail, at the cost of
+the CPU time the losers spent.
+"""
+
+import functools
+import multiprocessing
+import random
+import typing
+
+from wordsearch import _generator
+from wordsearch._stats import NO_STATS, Stats
+
+
+class _Outcome(typing.NamedTuple):
+    seed: int
+    puzzle: typing.Optional[_generator.Puzzle]
+    error: typing.Optional[str]
+    stats: typing.Optional[typing.Dict[str, typing.Any]]
+
+
+def derive_seeds(seed: int, count: int) -> typing.List[int]:
+    """``count`` seeds to race for ``seed``: itself, then ones picked from it (always the same)."""
+    rng = random.Random(f"race:{seed}")
+    seeds = [seed]
+    while len(seeds) < count:
+        derived = rng.randint(0, 2**31 - 1)
+        if derived not in seeds:
+            seeds.append(derived)
+    return seeds
+
+
+def _run_racer(
+    seed: int,
+    words: typing.Sequence[str],
+    collect_stats: bool,
+    options: typing.Dict[str, typing.Any],
+) -> _Outcome:
+    stats = Stats() if collect_stats else NO_STATS
+    try:
+        puzzle = _generator.generate_puzzle(words, seed=seed, stats=stats, **options)
+    except ValueError as e:
+        return _Outcome(seed, None, str(e), stats.as_dict() if collect_stats else None)
+    return _Outcome(seed, puzzle, None, stats.as_dict() if collect_stats else None)
+
+
+def _no_log(message: str):
+    pass
+
+
+def race_puzzle(
+    words: typing.Sequence[str],
+    racers: int,
+    seed: typing.Optional[int] = None,
+    log: typing.Callable[[str], None] = _no_log,
+    stats: Stats = NO_STATS,
+    **options: typing.Any,
+) -> _generator.Puzzle:
+    """Generate the puzzle with ``racers`` seeds derived from ``seed`` at once, one process each.
+
+    The first to finish without error wins and the rest are stopped. The returned
+    puzzle's ``seed`` is the derived seed that won, which gives the same puzzle if
+    passed to ``generate_puzzle`` on its own. ``stats`` gets the winner's stats. Other
+    keyword arguments are passed on to ``generate_puzzle``. Raises ValueError if
+    every seed fails.
+    """
+    if seed is None:
+        seed = random.randint(0, 2**10 - 1)
+    seeds = derive_seeds(seed, racers)
+    if racers == 1:
+        return _generator.generate_puzzle(words, seed=seed, log=log, stats=stats, **options)
+
+    if options.get("dictionary") is None and not options.get("auto_size"):
+        # load before the pool starts so forked workers share this copy (see _batch.run_batch);
+        # an auto-sized grid's size isn't known until it's placed, so each racer loads its own
+        size = _generator.default_size(words)
+        _generator.preload_dictionary(
+            words, options.get("width") or size, options.get("height") or size
+        )
+    errors = []
+    run = functools.partial(_run_racer, words=words, collect_stats=stats.enabled, options=options)
+    with multiprocessing.Pool(racers) as pool:  # leaving the block terminates the losers
+        for outcome in pool.imap_unordered(run, seeds):
+            if outcome.puzzle is not None:
+                if outcome.stats:
+                    stats.merge(outcome.stats)
+                stats.count_by("race_winner", str(seeds.index(outcome.seed)))
+                log(
+                    f"Seed {outcome.seed} finished first of {racers} derived from {seed} "
+                    "(it gives this puzzle on its own)"
+                )
+                return outcome.puzzle
+            errors.append(f"seed {outcome.seed}: {outcome.error}")
+    raise ValueError(f"Every seed failed ({'; '.join(errors)})")
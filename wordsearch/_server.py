@@ -0,0 +1,224 @@
+"""A small local HTTP/JSON server that keeps the dictionary loaded between puzzles.
+
+``POST /generate`` with a JSON body like::
+
+    {"words": ["cat", "dog"], "width": 10, "height": 10, "hardness": "hard", "seed": 42}
+
+(everything but ``words`` is optional; sizes go up to ``MAX_GRID_SIZE``) returns
+the puzzle as ``Puzzle.as_dict``.
+``GET /health`` returns ``{"status": "ok"}``. Generation runs in a process pool so
+a slow puzzle doesn't hold up other requests, and gives up after ``timeout``
+seconds so it can't hold a worker indefinitely either.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import signal
+import typing
+
+from wordsearch import _cache, _english_words, _generator
+
+_MAX_BODY_SIZE = 1024 * 1024
+# a grid much bigger than this can run a worker out of memory, and a pool with a dead worker
+# stays broken
+MAX_GRID_SIZE = 1000
+DEFAULT_TIMEOUT = 60
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    414: "URI Too Long",
+    422: "Unprocessable Entity",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class _RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _optional_int(request: typing.Dict[str, typing.Any], name: str) -> typing.Optional[int]:
+    value = request.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= MAX_GRID_SIZE:
+        raise _RequestError(400, f"{name} must be an integer from 1 to {MAX_GRID_SIZE}")
+    return value
+
+
+def _parse_request(body: bytes) -> typing.Dict[str, typing.Any]:
+    try:
+        request = json.loads(body)
+    except ValueError as e:
+        raise _RequestError(400, f"Body is not valid JSON: {e}")
+    if not isinstance(request, dict):
+        raise _RequestError(400, "Body must be a JSON object")
+
+    words = request.get("words")
+    if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+        raise _RequestError(400, "words must be a list of strings")
+    words = _generator.clean_words(words)
+    if not words:
+        raise _RequestError(400, "Please provide at least one word")
+    if (
+        _generator.default_size(words) > MAX_GRID_SIZE
+    ):  # the grid's size when width or height is left out
+        raise _RequestError(400, f"Words can be at most {MAX_GRID_SIZE - 2} letters long")
+
+    hardness_level = str(request.get("hardness", "medium")).lower()
+    if hardness_level not in _generator.HARDNESS_LEVELS:
+        raise _RequestError(400, f"hardness must be one of {', '.join(_generator.HARDNESS_LEVELS)}")
+    fill_mode = str(request.get("fill_mode", "constrained")).lower()
+    if fill_mode not in _generator.FILL_MODES:
+        raise _RequestError(400, f"fill_mode must be one of {', '.join(_generator.FILL_MODES)}")
+    seed = request.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise _RequestError(400, "seed must be an integer")
+
+    return {
+        "words": words,
+        "width": _optional_int(request, "width"),
+        "height": _optional_int(request, "height"),
+        "hardness_level": hardness_level,
+        "seed": seed,
+        "fill_mode": fill_mode,
+    }
+
+
+def _time_out(signum, frame):
+    raise TimeoutError
+
+
+def _generate(
+    options: typing.Dict[str, typing.Any], timeout: float
+) -> typing.Dict[str, typing.Any]:
+    """Runs in a worker process, freed after ``timeout`` seconds where the platform has timers."""
+    if not hasattr(signal, "setitimer"):  # Windows; the handler still stops waiting on it
+        return _generator.generate_puzzle(**options).as_dict()
+    previous = signal.signal(signal.SIGALRM, _time_out)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _generator.generate_puzzle(**options).as_dict()
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+async def _readline(reader: asyncio.StreamReader, too_long: int) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:  # longer than the reader's limit (64 KiB)
+        raise _RequestError(
+            too_long, "Request line is too long" if too_long == 414 else "Header is too long"
+        )
+
+
+async def _read_request(reader: asyncio.StreamReader) -> typing.Tuple[str, str, bytes]:
+    request_line = (await _readline(reader, 414)).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise _RequestError(400, "Malformed request line")
+    method, path, _ = request_line
+
+    content_length = 0
+    while (line := await _readline(reader, 431)) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            try:
+                content_length = int(value.strip())
+            except ValueError:
+                raise _RequestError(400, "Bad Content-Length")
+    if content_length < 0:
+        raise _RequestError(400, "Bad Content-Length")
+    if content_length > _MAX_BODY_SIZE:
+        raise _RequestError(413, "Request body is too large")
+    body = await reader.readexactly(content_length) if content_length else b""
+    return method.upper(), path.split("?", 1)[0], body
+
+
+def _write_response(
+    writer: asyncio.StreamWriter, status: int, payload: typing.Dict[str, typing.Any]
+):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1") + body
+    )
+
+
+async def _handle(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    pool: concurrent.futures.Executor,
+    cache: typing.Optional[_cache.ResultCache] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+):
+    try:
+        try:
+            method, path, body = await _read_request(reader)
+            if (method, path) == ("GET", "/health"):
+                status, payload = 200, {"status": "ok"}
+            elif (method, path) == ("POST", "/generate"):
+                options = dict(_parse_request(body), cache=cache)
+                loop = asyncio.get_running_loop()
+                try:
+                    # a little longer than the worker's own timer, which frees the worker too
+                    payload = await asyncio.wait_for(
+                        loop.run_in_executor(pool, _generate, options, timeout), timeout + 5
+                    )
+                except (TimeoutError, asyncio.TimeoutError):
+                    raise _RequestError(
+                        503, f"Generating the puzzle took longer than {timeout} seconds"
+                    )
+                except ValueError as e:  # e.g. the words don't fit in the grid
+                    raise _RequestError(422, str(e))
+                except Exception as e:  # e.g. a worker died; answer rather than drop the connection
+                    raise _RequestError(
+                        500, f"Generating the puzzle failed: {type(e).__name__}: {e}"
+                    )
+                status = 200
+            else:
+                raise _RequestError(404, f"No such endpoint: {method} {path}")
+        except _RequestError as e:
+            status, payload = e.status, {"error": str(e)}
+        _write_response(writer, status, payload)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    host: str,
+    port: int,
+    workers: typing.Optional[int] = None,
+    ready: typing.Callable[[str], None] = print,
+    cache: typing.Optional[_cache.ResultCache] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+):
+    """Serve puzzle generation on ``host``:``port`` until cancelled.
+
+    Puzzles are reused from ``cache``, if given. Each puzzle gets ``timeout`` seconds
+    before the request is answered with a 503.
+    """
+    _english_words.preload()  # forked workers inherit it; spawned ones load it in their initializer
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_english_words.preload
+    ) as pool:
+        # start the workers before accepting connections: one forked later would inherit the
+        # client's socket and keep it open, so the client never sees the response end
+        await asyncio.get_running_loop().run_in_executor(pool, _english_words.check_for_other_words)
+        server = await asyncio.start_server(
+            lambda r, w: _handle(r, w, pool, cache, timeout), host, port
+        )
+        async with server:
+            ready(f"Serving word searches on http://{host}:{port} (POST /generate)")
+            await server.serve_forever()
@@ -0,0 +1,111 @@
+"""Finding the smallest grid the words fit in (``--auto-size``)."""
+
+import math
+import random
+import typing
+
+from wordsearch import _placement
+from wordsearch._stats import NO_STATS, Stats
+
+# placements tried at each size before calling it too small; a size that's going to
+# work almost always does well within this, so failures are abandoned early
+SIZE_NODE_BUDGET = 2_000
+
+
+class SizedGrid(typing.NamedTuple):
+    width: int
+    height: int
+    grid: typing.Any
+    placements: typing.Dict[str, _placement.Placement]
+
+
+def _dimensions(
+    size: int, width: typing.Optional[int], height: typing.Optional[int]
+) -> typing.Tuple[int, int]:
+    """The grid for candidate ``size``: square unless one side was given."""
+    return width or size, height or size
+
+
+def _fits_somewhere(words, directions, width: int, height: int) -> bool:
+    slots = _placement.SlotIndex(width, height)
+    return all(
+        any(slots.starts(len(word), direction) for direction in directions) for word in words
+    )
+
+
+def lower_bound(
+    words, directions, width: typing.Optional[int] = None, height: typing.Optional[int] = None
+) -> int:
+    """The smallest candidate size in which each word, on its own, has somewhere to go.
+
+    E.g. with only left-to-right words the longest word sets the width, but a
+    fixed-width grid with room for down words can be shorter than the longest word.
+    """
+    longest = max(len(word) for word in words)
+    for size in range(1, longest + 1):
+        if _fits_somewhere(words, directions, *_dimensions(size, width, height)):
+            return size
+    raise ValueError(f"Word is too long for grid. Word: {max(words, key=len)}")
+
+
+def _estimate(
+    words, density: float, width: typing.Optional[int], height: typing.Optional[int]
+) -> int:
+    """The size at which the letters of every word would fill ``density`` of the grid."""
+    cells = sum(len(word) for word in set(words)) / density
+    if width or height:
+        return math.ceil(cells / (width or height))
+    return math.ceil(math.sqrt(cells))
+
+
+def find_size(
+    words,
+    directions,
+    rng: random.Random,
+    make_grid: typing.Callable[[int, int], typing.Any],
+    width: typing.Optional[int] = None,
+    height: typing.Optional[int] = None,
+    target_density: typing.Optional[float] = None,
+    stats: Stats = NO_STATS,
+) -> SizedGrid:
+    """Find the smallest grid the words can be placed in, and place them there.
+
+    If ``width`` or ``height`` is given only the other side is searched, otherwise
+    the grid is square. Sizes below ``lower_bound`` aren't tried at all. Without a
+    ``target_density`` the search starts where the letters would exactly fill the
+    grid and works down while the words still fit (they can share letters), or up
+    until they do; with one it starts where the letters fill that fraction of the
+    grid and only works up. Only placement runs for each size, with a small node
+    budget, so a size that is too small is given up on quickly.
+    """
+    minimum = lower_bound(words, directions, width, height)
+    start = max(minimum, _estimate(words, target_density or 1.0, width, height))
+    longest = max(len(word) for word in words)
+    maximum = max(start, longest) * 4
+
+    def attempt(size: int) -> typing.Optional[SizedGrid]:
+        stats.count("auto_size_attempts")
+        grid_width, grid_height = _dimensions(size, width, height)
+        grid = make_grid(grid_width, grid_height)
+        try:
+            placements = _placement.place_words(
+                grid, words, directions, rng, node_budget=SIZE_NODE_BUDGET, stats=stats
+            )
+        except ValueError:
+            return None
+        return SizedGrid(grid_width, grid_height, grid, placements)
+
+    best = None
+    size = start
+    while best is None:
+        if size > maximum:
+            raise ValueError(f"Could not find a grid the words fit in (tried up to {size - 1}).")
+        best = attempt(size)
+        size += 1
+
+    if target_density is None:
+        size = (best.height if width else best.width) - 1
+        while size >= minimum and (smaller := attempt(size)) is not None:
+            best = smaller
+            size -= 1
+    return best
@@ -0,0 +1,89 @@
+"""Counters and stage timers for the generation pipeline.
+
+Everything that does real work takes a ``stats`` argument defaulting to ``NO_STATS``,
+whose methods do nothing, so when no one is looking the counting costs a no-op call
+per placement tried, line scanned or dictionary walk (walks add up their steps
+locally and report once).
+"""
+
+import collections
+import contextlib
+import json
+import time
+import typing
+
+
+class Stats:
+    """What happened while generating a puzzle (or several, see ``merge``)."""
+
+    enabled = True
+
+    def __init__(self):
+        self.timings: typing.Dict[str, float] = {}
+        self.counters: typing.Counter[str] = collections.Counter()
+        self.breakdowns: typing.Dict[str, typing.Counter[str]] = {}
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def count_by(self, name: str, key: str, amount: int = 1):
+        """Count under ``name`` and also under ``key`` within it (e.g. per word or direction)."""
+        self.counters[name] += amount
+        self.breakdowns.setdefault(name, collections.Counter())[key] += amount
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """Add the wall-clock time spent in the ``with`` block to ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = self.timings.get(stage, 0.0) + time.perf_counter() - start
+
+    def merge(self, other: typing.Dict[str, typing.Any]):
+        """Add in the ``as_dict`` of another run (e.g. from a worker process)."""
+        for stage, seconds in other["timings"].items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        self.counters.update(other["counters"])
+        for name, counts in other["breakdowns"].items():
+            self.breakdowns.setdefault(name, collections.Counter()).update(counts)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "timings": dict(self.timings),
+            "counters": dict(self.counters),
+            "breakdowns": {name: dict(counts) for name, counts in self.breakdowns.items()},
+        }
+
+    def format(self, style: str) -> str:
+        """The stats as ``json`` or human-readable ``text``."""
+        if style == "json":
+            return json.dumps(self.as_dict(), indent=2)
+
+        lines = ["Timings:"]
+        lines += [f"  {stage:<20} {seconds:9.4f}s" for stage, seconds in self.timings.items()]
+        lines.append("Counters:")
+        for name, total in sorted(self.counters.items()):
+            lines.append(f"  {name:<20} {total:9}")
+            counts = self.breakdowns.get(name, {})
+            lines += [
+                f"    {key:<18} {count:9}"
+                for key, count in sorted(counts.items(), key=lambda item: -item[1])
+            ]
+        return "\n".join(lines)
+
+
+class _NoStats(Stats):
+    enabled = False
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def count_by(self, name: str, key: str, amount: int = 1):
+        pass
+
+    def timer(self, stage: str):
+        return contextlib.nullcontext()
+
+
+NO_STATS: Stats = _NoStats()
@@ -0,0 +1,72 @@
+"""Checking existing puzzles (ours or anyone else's) for bonus words."""
+
+import functools
+import glob
+import json
+import multiprocessing
+import pathlib
+import typing
+
+from wordsearch import _bonus_words, _english_words, _grid
+
+
+def find_puzzle_files(paths: typing.Iterable[str]) -> typing.List[pathlib.Path]:
+    """Expand files, directories (their ``*.txt`` files) and glob patterns into a list of files."""
+    files = []
+    for path in paths:
+        if pathlib.Path(path).is_dir():
+            files.extend(sorted(pathlib.Path(path).glob("*.txt")))
+        elif pathlib.Path(path).is_file():
+            files.append(pathlib.Path(path))
+        else:
+            matches = sorted(glob.glob(path, recursive=True))
+            if not matches:
+                raise ValueError(f"No files match {path}")
+            files.extend(pathlib.Path(match) for match in matches if pathlib.Path(match).is_file())
+    return list(dict.fromkeys(files))
+
+
+def scan_file(
+    file: pathlib.Path, allowed: typing.AbstractSet[str] = frozenset()
+) -> typing.Dict[str, typing.Any]:
+    """The report for one puzzle file: its size and every dictionary word in it (or why not).
+
+    Words in ``allowed`` (uppercase, see ``_bonus_words.allowed_words``) aren't reported.
+    """
+    try:
+        grid = _grid.read_grid(file.read_text(encoding="utf-8"))
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        return {"file": str(file), "error": str(e)}
+
+    # blank cells become spaces so no word can read across them
+    grid = [[ch.upper() or " " for ch in row] for row in grid]
+    hits = _bonus_words.find_all_hits(grid, _english_words.load_automaton(), allowed)
+    return {
+        "file": str(file),
+        "width": len(grid[0]),
+        "height": len(grid),
+        "hits": [
+            {"word": hit.word, "x": hit.x, "y": hit.y, "direction": hit.direction.name}
+            for hit in sorted(hits, key=_bonus_words.Hit.sort_key)
+        ],
+    }
+
+
+def verify_files(
+    files: typing.Sequence[pathlib.Path],
+    report: typing.TextIO,
+    processes: typing.Optional[int] = None,
+    allowed: typing.AbstractSet[str] = frozenset(),
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    """Scan ``files`` across ``processes`` workers, writing a JSON line per file to ``report``.
+
+    Each line is written as soon as that file is done. Yields each file's report
+    too, so the caller can show progress.
+    """
+    _english_words.preload()  # forked workers share it (see _batch.run_batch)
+    with multiprocessing.Pool(processes) as pool:
+        scan = functools.partial(scan_file, allowed=allowed)
+        for result in pool.imap_unordered(scan, files, chunksize=16):
+            report.write(json.dumps(result) + "\n")
+            report.flush()
+            yield result